@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
-from chatbot import get_chatbot_reply
+import chatbot
+from chatbot import stream_chatbot_reply
 
 # Set page config with title and icon
 st.set_page_config(
@@ -55,6 +56,16 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+
+@st.cache_resource(show_spinner=False)
+def shared_resources():
+    """
+    One Groq client and one Postgres pool per server process, shared by
+    every session; Streamlit reruns this script on each interaction.
+    """
+    return chatbot.get_client(), chatbot.get_pool()
+
+
 st.title("🏥 Medical Chatbot")
 st.write("Ask me about doctors, hospitals, symptoms, specialties, and availability.")
 
@@ -64,45 +75,114 @@ with st.form(key='chat_form', clear_on_submit=True):
     user_input = st.text_area("Enter your health concern and hospital:", max_chars=200, height=80)
     submit_button = st.form_submit_button("Get Recommendation")
 
+def render_user(text):
+    st.markdown(f"""
+        <div class='chatbox'>
+            <div class='user-msg'>You:</div>
+            <div>{text}</div>
+        </div>
+    """, unsafe_allow_html=True)
+
+
+def render_response(placeholder, text):
+    placeholder.markdown(f"""
+        <div class='chatbox'>
+            <div class='bot-msg'>Chatbot Response:</div>
+            <div>{text}</div>
+        </div>
+    """, unsafe_allow_html=True)
+
+
+def render_sql_box(placeholder, sql_query):
+    placeholder.markdown(f"""
+        <div class='chatbox sql-query'>
+        <strong>Generated SQL Query:</strong>
+        <pre>{sql_query}</pre>
+        </div>
+    """, unsafe_allow_html=True)
+
+
+def turn_page(step):
+    st.session_state.page = max(0, st.session_state.get("page", 0) + step)
+
+
+def render_table(placeholder, rows, pages):
+    """
+    Results Table. Unlimited answers come with a ResultPages handle; only the
+    current page is fetched, and Previous / Next fetch further pages on demand.
+    """
+    with placeholder.container():
+        number = st.session_state.get("page", 0) if pages is not None else 0
+        if number:
+            rows = pages.page(number)
+        if rows:
+            st.table(pd.DataFrame(rows))
+        else:
+            st.warning("❌ No matching records found.")
+        if pages is not None:
+            prev_col, info_col, next_col = st.columns([1, 2, 1])
+            prev_col.button("◀ Previous", key="page_prev", disabled=number == 0, on_click=turn_page, args=(-1,))
+            count = f" of {pages.page_count}" if pages.page_count else ""
+            info_col.caption(f"Page {number + 1}{count} · {pages.page_size} rows per page")
+            next_col.button("Next ▶", key="page_next", disabled=not pages.has_next(number),
+                            on_click=turn_page, args=(1,))
+
+
+def forget_last_reply():
+    last = st.session_state.pop("last", None)
+    if last and last["reply"].get("pages") is not None:
+        last["reply"]["pages"].close()
+    st.session_state.page = 0
+
+
 if submit_button:
     if user_input.strip():
-        with st.spinner("🤖 Thinking..."):
-            reply = get_chatbot_reply(user_input, filepath="hospital_dataset.csv")
-
+        forget_last_reply()
         with chat_container:
             # User Message
-            st.markdown(f"""
-                <div class='chatbox'>
-                    <div class='user-msg'>You:</div>
-                    <div>{user_input}</div>
-                </div>
-            """, unsafe_allow_html=True)
-
-            # Chatbot Reply (Natural language)
-            st.markdown(f"""
-                <div class='chatbox'>
-                    <div class='bot-msg'>Chatbot Response:</div>
-                    <div>{reply['result']}</div>
-                </div>
-            """, unsafe_allow_html=True)
-
-            # SQL Query Display
-            st.markdown(f"""
-                <div class='chatbox sql-query'>
-                <strong>Generated SQL Query:</strong>
-                <pre>{reply['sql_query']}</pre>
-                </div>
-            """, unsafe_allow_html=True)
-
-            # Results Table
-            if reply["rows"]:
-                df = pd.DataFrame(reply["rows"])
-                st.table(df)
-            else:
-                st.warning("❌ No matching records found.")
-
-            # NLP Suggestions if any
-            if reply.get("nlp_suggestion"):
-                st.info(f"💡 NLP Suggestion: {reply['nlp_suggestion']}")
+            render_user(user_input)
+
+            # Filled in as the pipeline produces each part: SQL, then rows, then text
+            response_box = st.empty()
+            sql_box = st.empty()
+            table_box = st.empty()
+            suggestion_box = st.empty()
+            render_response(response_box, "🤖 Thinking...")
+
+            shared_resources()
+            sql_text, paragraphs = "", []
+            for event in stream_chatbot_reply(user_input, filepath="hospital_dataset.csv", paginate=True, hedge=True):
+                kind = event["event"]
+                if kind == "sql_token":
+                    sql_text += event["text"]
+                    render_sql_box(sql_box, sql_text)
+                elif kind == "sql":
+                    render_sql_box(sql_box, event["sql_query"])
+                elif kind == "rows":
+                    render_table(table_box, event["rows"], event["pages"])
+                elif kind == "text":
+                    # Chatbot Reply (Natural language)
+                    paragraphs.append(event["text"])
+                    render_response(response_box, "\n\n".join(paragraphs))
+                elif kind == "done":
+                    reply = event["reply"]
+                    if not paragraphs:
+                        # Invalid SQL: no rows or text events
+                        render_response(response_box, reply["result"])
+                        render_sql_box(sql_box, reply["sql_query"])
+                    # NLP Suggestions if any
+                    if reply.get("nlp_suggestion"):
+                        suggestion_box.info(f"💡 NLP Suggestion: {reply['nlp_suggestion']}")
+                    # Kept so page navigation (which reruns the script) can redraw the answer
+                    st.session_state.last = {"query": user_input, "reply": reply}
     else:
         st.warning("⚠️ Please enter a health-related query to get a recommendation.")
+elif "last" in st.session_state:
+    last = st.session_state.last
+    with chat_container:
+        render_user(last["query"])
+        render_response(st.empty(), last["reply"]["result"])
+        render_sql_box(st.empty(), last["reply"]["sql_query"])
+        render_table(st.empty(), last["reply"]["rows"], last["reply"].get("pages"))
+        if last["reply"].get("nlp_suggestion"):
+            st.info(f"💡 NLP Suggestion: {last['reply']['nlp_suggestion']}")
@@ -0,0 +1,114 @@
+import re
+import math
+import argparse
+
+
+# -------------------- Coimbatore Areas --------------------
+# Approximate centre (latitude, longitude) of every area in the dataset.
+# Kandhipuram is the dataset's spelling variant of Gandhipuram.
+AREAS = {
+    "Gandhipuram": (11.0183, 76.9674),
+    "Kandhipuram": (11.0183, 76.9674),
+    "Town Hall": (10.9946, 76.9616),
+    "Race Course": (11.0003, 76.9770),
+    "Rs Puram": (11.0081, 76.9500),
+    "Ukkadam": (10.9884, 76.9585),
+    "Selvapuram": (10.9850, 76.9380),
+    "Kuniyamuthur": (10.9652, 76.9470),
+    "Podanur": (10.9631, 76.9771),
+    "Kovaipudur": (10.9430, 76.9250),
+    "Perur": (10.9753, 76.9131),
+    "Kk Pudur": (11.0200, 76.9430),
+    "Saibaba Colony": (11.0251, 76.9420),
+    "Vadavalli": (11.0262, 76.9030),
+    "Marudamalai": (11.0463, 76.8530),
+    "Ganapathy": (11.0380, 76.9710),
+    "Thudiyalur": (11.0790, 76.9430),
+    "Saravanampatti": (11.0780, 77.0010),
+    "Kalapatti": (11.0710, 77.0390),
+    "Peelamedu": (11.0272, 77.0160),
+    "Avinashi Road": (11.0200, 77.0000),
+    "Singanallur": (10.9990, 77.0320),
+    "Chinniampalayam": (11.0270, 77.0580),
+    "Irugur": (11.0160, 77.0640),
+    "Sulur": (11.0240, 77.1250),
+}
+
+# Other spellings users type, by area
+ALIASES = {
+    "Rs Puram": ["r.s. puram", "r s puram"],
+    "Kk Pudur": ["k.k. pudur", "k k pudur"],
+    "Avinashi Road": ["avinashi"],
+    "Kovaipudur": ["kovai pudur"],
+    "Saibaba Colony": ["sai baba colony"],
+}
+
+
+def area_key(name):
+    """Comparison key for an area name: lowercase letters and digits only"""
+    return re.sub(r"[^a-z0-9]", "", (name or "").lower())
+
+
+def haversine_km(a, b):
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0 * math.asin(math.sqrt(h))
+
+
+# -------------------- Distance Matrix --------------------
+# Built once at import: pairwise distances and, per area, every area
+# ordered nearest first, so a k-nearest lookup is a walk down one tuple.
+KEYS = [area_key(name) for name in AREAS]
+INDEX = {key: i for i, key in enumerate(KEYS)}
+DISTANCE_KM = [[haversine_km(a, b) for b in AREAS.values()] for a in AREAS.values()]
+NEAREST = {
+    key: tuple(KEYS[j] for j in sorted(range(len(KEYS)), key=lambda j: (DISTANCE_KM[i][j], j)))
+    for i, key in enumerate(KEYS)
+}
+
+_names = {area_key(name): name for name in AREAS}
+_names.update({area_key(alias): name for name, aliases in ALIASES.items() for alias in aliases})
+_AREA_PATTERN = re.compile(
+    r"\b(" + "|".join(
+        r"[\s.]*".join(re.escape(part) for part in re.split(r"[\s.]+", text.lower()) if part)
+        for text in sorted(list(AREAS) + [a for aliases in ALIASES.values() for a in aliases], key=len, reverse=True)
+    ) + r")\b"
+)
+
+
+def canonical_area(name):
+    """Dataset spelling of an area name or alias, or None if unknown"""
+    return _names.get(area_key(name))
+
+
+def distance_km(area_a, area_b):
+    """Distance between two areas' centres, or None if either is unknown"""
+    i, j = INDEX.get(area_key(canonical_area(area_a))), INDEX.get(area_key(canonical_area(area_b)))
+    if i is None or j is None:
+        return None
+    return DISTANCE_KM[i][j]
+
+
+def nearest(area):
+    """Keys of all known areas ordered by distance from area (itself first); () if unknown"""
+    return NEAREST.get(area_key(canonical_area(area)), ())
+
+
+def extract_area(text):
+    """First area named in free text (e.g. "cardiologist near RS Puram"), or None"""
+    match = _AREA_PATTERN.search((text or "").lower())
+    return canonical_area(match.group(1)) if match else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List the areas nearest to a Coimbatore area.")
+    parser.add_argument("area")
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    origin = canonical_area(args.area) or extract_area(args.area)
+    if origin is None:
+        raise SystemExit(f"unknown area {args.area!r}; known: {', '.join(AREAS)}")
+    for key in nearest(origin)[:args.k]:
+        name = _names[key]
+        print(f"📍 {name:<16} {distance_km(origin, name):>5.1f} km")
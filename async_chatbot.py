@@ -0,0 +1,238 @@
+import os
+import time
+import asyncio
+
+import asyncpg
+from groq import AsyncGroq
+
+from chatbot import (
+    LLAMA_MODEL, load_env, record_usage, normalize_input, rewrite_sql, invalid_sql_reply,
+    out_of_scope_reply, build_reply, detect_query_type, use_local_backend, get_pool as get_sync_pool,
+)
+from db import DATA_TABLES, TABLE_VERSION_SQL, connect_kwargs, dollar_placeholders
+from fast_path import extract_slots, detect_intent, build_sql
+from intent_classifier import classify, is_out_of_scope
+from llm_cache import get_cache
+from result_cache import get_result_cache
+import metrics
+import prompts
+from metrics import StageTimer
+from singleflight import AsyncSingleFlight
+
+
+# -------------------- Async Clients --------------------
+# Both are created on first use inside the running event loop
+async_client = None
+_pool = None
+_pool_lock = asyncio.Lock()
+
+
+def get_async_client():
+    global async_client
+    if async_client is None:
+        load_env()
+        async_client = AsyncGroq(api_key=os.getenv("GROQ_API_KEY"))
+    return async_client
+
+
+async def get_pool():
+    """asyncpg pool sized like the sync one (DB_POOL_MIN / DB_POOL_MAX), read-only sessions"""
+    global _pool
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                load_env()
+                settings = connect_kwargs()
+                _pool = await asyncpg.create_pool(
+                    database=settings["dbname"],
+                    user=settings["user"],
+                    password=settings["password"],
+                    host=settings["host"],
+                    port=int(settings["port"]) if settings["port"] else None,
+                    min_size=int(os.getenv("DB_POOL_MIN", "1")),
+                    max_size=int(os.getenv("DB_POOL_MAX", "10")),
+                    server_settings={"default_transaction_read_only": "on"},
+                )
+    return _pool
+
+
+# -------------------- Async Pipeline Stages --------------------
+async def ask_llama_async(user_query: str, usage=None, intent=None) -> str:
+    """
+    Non-blocking ask_llama; same prompt profiles, LLM cache and usage
+    dict as the sync pipeline. The cache may read and write its file, so
+    it is used from a worker thread.
+    """
+    load_env()
+    profile = prompts.prompt_profile()
+    system_prompt = prompts.system_prompt(profile, intent)
+    if usage is not None:
+        usage["profile"] = profile
+    cache = await asyncio.to_thread(get_cache)
+    cached = await asyncio.to_thread(cache.get, LLAMA_MODEL, system_prompt, user_query)
+    if cached is not None:
+        if usage is not None:
+            usage["cached"] = True
+        return cached
+    started = time.perf_counter()
+    response = await get_async_client().chat.completions.create(
+        model=LLAMA_MODEL,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_query}
+        ],
+        temperature=0  # deterministic SQL
+    )
+    record_usage(response, usage, profile, time.perf_counter() - started)
+    text = response.choices[0].message.content.strip()
+    await asyncio.to_thread(cache.set, LLAMA_MODEL, system_prompt, user_query, text)
+    return text
+
+
+async def warm_backend():
+    """Start the asyncpg pool, or build the local engine off the event loop"""
+    if use_local_backend():
+        await asyncio.to_thread(get_sync_pool)
+    else:
+        await get_pool()
+
+
+async def run_query_async(sql, params=None, retries=1):
+    """Execute a read-only query on a pooled connection and return rows as dicts"""
+    if use_local_backend():
+        # In-process engine (CHATBOT_BACKEND=local): microseconds, run on a worker thread
+        return await asyncio.to_thread(get_sync_pool().run_query, sql, params)
+    if params:
+        sql = dollar_placeholders(sql)
+    pool = await get_pool()
+    for attempt in range(retries + 1):
+        try:
+            async with pool.acquire() as conn:
+                records = await conn.fetch(sql, *(params or ()))
+                return [dict(record) for record in records]
+        except (asyncpg.exceptions.ConnectionDoesNotExistError, ConnectionError):
+            # The pool drops the dead connection; try once more on a fresh one
+            if attempt == retries:
+                raise
+
+
+async def data_version_async():
+    """db.table_version of the chatbot tables, read through the asyncpg pool"""
+    if use_local_backend():
+        return await asyncio.to_thread(lambda: get_sync_pool().data_version())
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow(dollar_placeholders(TABLE_VERSION_SQL), list(DATA_TABLES))
+    return tuple(row.values())
+
+
+async def run_cached_async(sql, params=None):
+    """run_query_async behind the result cache shared with the sync pipeline"""
+    cache = get_result_cache()
+    if cache.max_entries <= 0:
+        return await run_query_async(sql, params)
+    if cache.stale():
+        cache.set_version(await data_version_async())
+    version = cache.version
+    rows = cache.get(sql, params)
+    if rows is None:
+        rows = await run_query_async(sql, params)
+        cache.put(sql, params, rows, version)
+    return rows
+
+
+# Concurrent identical questions (same normalized text) are answered once
+reply_flights = AsyncSingleFlight()
+metrics.registry.register_gauges("chatbot_singleflight_async", reply_flights.stats)
+
+
+async def get_chatbot_reply_async(user_query, filepath):
+    """
+    Async get_chatbot_reply with the same return dict as chatbot.py.
+    Many questions can be answered concurrently with asyncio.gather; the
+    ones that normalize to the same text share one answer.
+    """
+    clean_query = normalize_input(user_query)
+    reply = await reply_flights.do((clean_query, filepath), answer_async, clean_query, filepath)
+    return dict(reply)
+
+
+async def answer_async(clean_query, filepath):
+    """
+    The sync pipeline's stages, with its timings and usage in the reply.
+    The CPU-bound ones (vocabulary and model loading on first use, sqlglot)
+    run on worker threads so they never stall the event loop.
+    """
+    timer = StageTimer()
+    usage = {}
+    availability_filter = any(word in clean_query for word in ["available", "availability", "currently available", "free", "open", "now"])
+
+    with timer.span("fuzzy"):
+        slots = await asyncio.to_thread(extract_slots, clean_query, filepath)
+        intent = detect_intent(clean_query, filepath, slots)
+    if intent:
+        path = "template"
+        sql_query, params = build_sql(intent)
+        query_type = intent["query_type"]
+    else:
+        with timer.span("classify"):
+            prediction = await asyncio.to_thread(classify, clean_query, filepath, slots)
+        if is_out_of_scope(prediction):
+            path = "out_of_scope"
+            reply = out_of_scope_reply(path)
+            reply.update(timings=timer.finish(path), usage=usage)
+            return reply
+
+        path = "llm"
+        params = None
+        query_type = prediction["intent"] if prediction["intent"] != "out_of_scope" else detect_query_type(clean_query)
+        with timer.span("llm"):
+            # Pool start-up (first request) overlaps with the Groq round trip
+            llama_output, _ = await asyncio.gather(ask_llama_async(clean_query, usage, query_type), warm_backend())
+        with timer.span("sql_rewrite"):
+            sql_query = await asyncio.to_thread(rewrite_sql, llama_output, availability_filter)
+
+        if sql_query is None:
+            reply = invalid_sql_reply(llama_output, path)
+            reply.update(timings=timer.finish(path), usage=usage)
+            return reply
+
+    with timer.span("execute"):
+        rows = await run_cached_async(sql_query, params)
+    metrics.observe("chatbot_result_rows", len(rows), buckets=metrics.COUNT_BUCKETS, path=path)
+
+    with timer.span("format"):
+        reply = build_reply(sql_query, params, rows, query_type, path)
+    reply.update(timings=timer.finish(path), usage=usage)
+    return reply
+
+
+async def close():
+    """Close the asyncpg pool and the async Groq client"""
+    global _pool, async_client
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+    if async_client is not None:
+        await async_client.close()
+        async_client = None
+
+
+if __name__ == "__main__":
+    async def main():
+        print("🤖 Medical Assistant (async) Ready! Ask me about hospitals, doctors, or symptoms.")
+        try:
+            while True:
+                user_query = await asyncio.to_thread(input, "\n🩺 Your question (or type 'exit'): ")
+                if user_query.lower() == "exit":
+                    break
+                try:
+                    response = await get_chatbot_reply_async(user_query, filepath="hospital_dataset.csv")
+                    print("\n📝 Generated SQL Query:\n", response.get("sql_query", ""))
+                    print("\n💡 Chatbot Response:\n", response.get("result", ""))
+                except Exception as e:
+                    print("❌ Unexpected error:", e)
+        finally:
+            await close()
+
+    asyncio.run(main())
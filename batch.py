@@ -0,0 +1,133 @@
+import os
+import sys
+import json
+import time
+import argparse
+from collections import OrderedDict
+
+from chatbot import get_chatbot_replies, normalize_input
+
+
+# -------------------- JSONL Helpers --------------------
+def read_questions(path, field, id_field):
+    """Yield (id, question) pairs; ids default to the line number"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            question = record.get(field) if isinstance(record, dict) else record
+            if not question:
+                print(f"⚠️ Line {line_no}: no '{field}' field, skipped", file=sys.stderr)
+                continue
+            record_id = record.get(id_field, line_no) if isinstance(record, dict) else line_no
+            yield str(record_id), question
+
+
+def read_done_ids(path):
+    """Ids already written to the output file (the checkpoint)"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(str(json.loads(line)["id"]))
+            except (ValueError, KeyError):
+                # A half-written last line from an interrupted run
+                continue
+    return done
+
+
+def chunked(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# -------------------- Batch Runner --------------------
+def run_batch(input_path, output_path, filepath="hospital_dataset.csv", field="query",
+              id_field="id", concurrency=8, chunk_size=256, memo_size=10000):
+    """
+    Answer every question in input_path and append one JSON line per answer
+    to output_path. Each chunk is flushed to disk before the next starts, so
+    a rerun skips everything already answered and retries failures. The
+    memo_size most recently answered questions are remembered, so repeats
+    across chunks are free; failures are not, so a repeat asks again.
+    """
+    done = read_done_ids(output_path)
+    pending = ((qid, q) for qid, q in read_questions(input_path, field, id_field) if qid not in done)
+    answered = OrderedDict()  # normalized question → successful reply, least recently used first
+    total = unique = failed = 0
+    started = time.perf_counter()
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        for chunk in chunked(pending, chunk_size):
+            replies = {}
+            for _, question in chunk:
+                key = normalize_input(question)
+                if key in answered:
+                    answered.move_to_end(key)
+                    replies[key] = answered[key]
+            new_questions = [q for _, q in chunk if normalize_input(q) not in replies]
+            for question, reply in zip(new_questions, get_chatbot_replies(new_questions, filepath=filepath,
+                                                                          concurrency=concurrency)):
+                key = normalize_input(question)
+                if key in replies:
+                    continue
+                replies[key] = reply
+                if "error" not in reply:
+                    unique += 1
+                    answered[key] = reply
+                    if len(answered) > memo_size:
+                        answered.popitem(last=False)
+
+            for qid, question in chunk:
+                reply = replies[normalize_input(question)]
+                if "error" in reply:
+                    # Not checkpointed, so the next run retries it
+                    failed += 1
+                    continue
+                out.write(json.dumps({"id": qid, "query": question, "reply": reply},
+                                     ensure_ascii=False, default=str) + "\n")
+                total += 1
+            out.flush()
+            os.fsync(out.fileno())
+
+            elapsed = time.perf_counter() - started
+            print(f"✅ {total} answered ({unique} unique) in {elapsed:.1f}s — {total / elapsed:.1f} questions/s",
+                  file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "answered": total,
+        "unique": unique,
+        "failed": failed,
+        "skipped": len(done),
+        "seconds": elapsed,
+        "questions_per_second": total / elapsed if elapsed else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of questions with the medical chatbot.")
+    parser.add_argument("input", help="JSONL file with one question per line")
+    parser.add_argument("output", help="JSONL file to append answers to (also the resume checkpoint)")
+    parser.add_argument("--field", default="query", help="JSON field holding the question text")
+    parser.add_argument("--id-field", default="id", help="JSON field holding a stable question id")
+    parser.add_argument("--dataset", default="hospital_dataset.csv", help="CSV used for the template fast path")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--memo-size", type=int, default=10000, help="answered questions remembered for repeats")
+    args = parser.parse_args()
+
+    summary = run_batch(args.input, args.output, filepath=args.dataset, field=args.field,
+                        id_field=args.id_field, concurrency=args.concurrency, chunk_size=args.chunk_size,
+                        memo_size=args.memo_size)
+    print(json.dumps(summary, indent=2))
@@ -0,0 +1,423 @@
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import tracemalloc
+from contextlib import contextmanager
+
+
+SAMPLE_QUESTIONS = [
+    "Cardiologist available at PSG Hospitals",
+    "I have chest pain, which doctor should I see?",
+    "Is Dr. Arun Nair available now?",
+    "How many beds are free at Ganga Hospital",
+    "skin rash doctor near Gandhipuram",
+    "   Fever   and HEADACHE since yesterday ",
+    "List all neurologists",
+    "which hospital treats tumors",
+]
+
+# What the LLM typically sends back; used by the stub client and the rewrite stage
+SAMPLE_LLM_SQL = [
+    "SELECT doctor_name, specialty, experience_years, availability, hospital_name FROM hospital_doctor_data "
+    "WHERE specialty = 'Cardiology' LIMIT 3;",
+    "SELECT doctor_name, specialty, experience_years, availability, hospital_name FROM hospital_doctor_data "
+    "WHERE specialty IN (SELECT specialty FROM symptom_specialty WHERE symptom_keyword = 'fever') LIMIT 3;",
+    "SELECT hospital_name, available_beds FROM hospital_doctor_data WHERE hospital_name = 'Ganga Hospital' LIMIT 3;",
+    "SELECT doctor_name, specialty, hospital_name FROM hospital_doctor_data LIMIT 3;",
+]
+
+# Needs the LLM (typo) but fuzzily resolves to a local symptom answer
+HEDGE_QUESTION = "which hospitel treats tumors"
+
+FIND_DOCTORS_CASES = [
+    ("Cardiology", "PSG Hospitals"),
+    ("Neurology", "Ganga Hospital"),
+    ("Oncology", None),
+    ("Pediatrics", "Nowhere Hospital"),
+    ("Cardiology", None, 2, "Peelamedu"),
+]
+
+
+# -------------------- Offline Stand-ins --------------------
+class _Message:
+    def __init__(self, content):
+        self.content = content
+
+
+class _Choice:
+    def __init__(self, content):
+        self.message = _Message(content)
+
+
+class _Usage:
+    def __init__(self, prompt_tokens, completion_tokens):
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.total_tokens = prompt_tokens + completion_tokens
+
+
+class _Response:
+    def __init__(self, content, prompt_tokens):
+        self.choices = [_Choice(content)]
+        self.usage = _Usage(prompt_tokens, len(content.split()))
+
+
+class StubGroq:
+    """Answers chat.completions.create with canned SQL, no network"""
+
+    def __init__(self):
+        self.chat = self
+        self.completions = self
+        self.calls = 0
+
+    def create(self, messages=None, **kwargs):
+        self.calls += 1
+        prompt_tokens = sum(len(m["content"].split()) for m in messages or [])
+        return _Response(SAMPLE_LLM_SQL[self.calls % len(SAMPLE_LLM_SQL)], prompt_tokens)
+
+
+class _Delta:
+    def __init__(self, content):
+        self.content = content
+
+
+class _Chunk:
+    def __init__(self, content):
+        self.choices = [type("_StreamChoice", (), {"delta": _Delta(content)})()]
+
+
+class SlowStreamingGroq:
+    """Streams canned SQL word by word after delay seconds, like a slow Groq"""
+
+    def __init__(self, delay):
+        self.chat = self
+        self.completions = self
+        self.delay = delay
+
+    def create(self, messages=None, stream=False, **kwargs):
+        time.sleep(self.delay)
+        words = SAMPLE_LLM_SQL[1].split(" ")
+        if not stream:
+            return _Response(" ".join(words), 0)
+        return iter([_Chunk(word + " ") for word in words])
+
+
+class StandInCursor:
+    def __init__(self, db):
+        self.db = db
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.rows = self.db.run_query(sql, params)
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def close(self):
+        pass
+
+
+class StandInConnection:
+    """psycopg2-connection look-alike over the local engine, for modules that connect at import time"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self, *args, **kwargs):
+        return StandInCursor(self.db)
+
+    def close(self):
+        pass
+
+
+@contextmanager
+def offline_imports(db):
+    """Let chatbot.py / sam.py import without Groq credentials or a Postgres server"""
+    import psycopg2
+    os.environ.setdefault("GROQ_API_KEY", "offline-benchmark")
+    saved_cache_path = os.environ.get("LLM_CACHE_PATH")
+    os.environ["LLM_CACHE_PATH"] = ""
+    real_connect = psycopg2.connect
+    psycopg2.connect = lambda *args, **kwargs: StandInConnection(db)
+    try:
+        yield
+    finally:
+        psycopg2.connect = real_connect
+        if saved_cache_path is None:
+            os.environ.pop("LLM_CACHE_PATH", None)
+        else:
+            os.environ["LLM_CACHE_PATH"] = saved_cache_path
+
+
+# -------------------- Data Scaling --------------------
+def scaled_rows(rows, scale):
+    """Replicate the dataset; copies get distinct hospital names so indexes stay selective"""
+    for copy in range(scale):
+        for row in rows:
+            if copy:
+                row = dict(row, hospital_name=f"{row['hospital_name']} Branch {copy}")
+            yield row
+
+
+def write_csv(rows, fieldnames, path):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+# -------------------- Measurement --------------------
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def measure(fn, cases, iterations, max_seconds, alloc_iterations=20):
+    """Latency percentiles (microseconds) and allocations per call for fn(*case)"""
+    timings = []
+    deadline = time.perf_counter() + max_seconds
+    for i in range(iterations):
+        case = cases[i % len(cases)]
+        started = time.perf_counter()
+        fn(*case)
+        timings.append((time.perf_counter() - started) * 1e6)
+        if time.perf_counter() > deadline:
+            break
+    timings.sort()
+
+    # Allocation pass kept separate so tracing overhead does not skew latency
+    tracemalloc.start()
+    allocated = peak = 0
+    calls = min(alloc_iterations, len(timings))
+    for i in range(calls):
+        case = cases[i % len(cases)]
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        fn(*case)
+        after, call_peak = tracemalloc.get_traced_memory()
+        allocated += max(0, after - before)
+        peak = max(peak, call_peak - before)
+    tracemalloc.stop()
+
+    return {
+        "iterations": len(timings),
+        "p50_us": percentile(timings, 50),
+        "p95_us": percentile(timings, 95),
+        "p99_us": percentile(timings, 99),
+        "mean_us": statistics.fmean(timings) if timings else 0.0,
+        "retained_bytes_per_call": allocated / calls if calls else 0,
+        "peak_bytes": peak,
+    }
+
+
+def run_scale(scale, base_rows, fieldnames, iterations, max_seconds, workdir, postgres=None):
+    from fast_path import detect_intent, build_sql
+    from local_engine import LocalDatabase
+    import llm_cache
+    import result_cache
+    import sql_rewrite
+
+    csv_path = os.path.join(workdir, f"hospital_dataset_x{scale}.csv")
+    write_csv(scaled_rows(base_rows, scale), fieldnames, csv_path)
+    started = time.perf_counter()
+    db = LocalDatabase(csv_path)
+    load_seconds = time.perf_counter() - started
+
+    with offline_imports(db):
+        import chatbot
+        import sam
+    chatbot.client = StubGroq()
+    chatbot.pool = db
+    # Time the pipeline, not its caches: repeated questions would otherwise be
+    # result / LLM cache hits from the second iteration on
+    result_cache._default_cache = result_cache.ResultCache(max_entries=0)
+    llm_cache._default_cache = llm_cache.LLMCache(path=None, max_entries=0)
+
+    def uncached_reply(query, path):
+        sql_rewrite.rewrite.cache_clear()
+        return chatbot.get_chatbot_reply(query, path, hedge=False)
+
+    normalized = [chatbot.normalize_input(q) for q in SAMPLE_QUESTIONS]
+    template_sql = [build_sql(i) for i in (detect_intent(q, csv_path) for q in normalized) if i]
+    result_sets = [db.run_query(sql, params) for sql, params in template_sql]
+    result_sets = [r for r in result_sets if r] or [[]]
+    query_types = ["doctor", "hospital", "symptom"]
+
+    stages = {
+        "normalize_input": (chatbot.normalize_input, [(q,) for q in SAMPLE_QUESTIONS]),
+        # rewrite() is lru_cached; time the parse / rewrite itself
+        "sql_rewrite": (sql_rewrite.rewrite.__wrapped__, [(sql, avail) for sql in SAMPLE_LLM_SQL for avail in (True, False)]),
+        "execute": (db.run_query, template_sql),
+        "format_results": (chatbot.format_results, [(r, t) for r in result_sets for t in query_types]),
+        "find_doctors": (sam.find_doctors, [(csv_path, *case) for case in FIND_DOCTORS_CASES]),
+        "extract_symptom_and_hospital": (sam.extract_symptom_and_hospital, [(q.lower(),) for q in SAMPLE_QUESTIONS]),
+        "get_chatbot_reply": (uncached_reply, [(q, csv_path) for q in SAMPLE_QUESTIONS]),
+    }
+    if postgres is not None:
+        # Same statements against the real server (holding whatever load_data.py loaded)
+        import prepared
+        stages["execute_postgres"] = (lambda sql, params: prepared.run(postgres, sql, params), template_sql)
+
+    # One-time costs: first find_doctors builds the in-memory store
+    started = time.perf_counter()
+    sam.find_doctors(csv_path, "Cardiology", None)
+    store_build_seconds = time.perf_counter() - started
+
+    results = {
+        "rows": len(base_rows) * scale,
+        "local_engine_load_seconds": load_seconds,
+        "doctor_store_build_seconds": store_build_seconds,
+        "stages": {},
+    }
+    for name, (fn, cases) in stages.items():
+        results["stages"][name] = measure(fn, cases, iterations, max_seconds)
+        stage = results["stages"][name]
+        print(f"  {name:<30} p50 {stage['p50_us']:>10.1f}us  p95 {stage['p95_us']:>10.1f}us  "
+              f"p99 {stage['p99_us']:>10.1f}us  peak {stage['peak_bytes']:>9} B", file=sys.stderr)
+    return results
+
+
+def check_hedge(dataset, deadline=0.2, slow=1.0):
+    """
+    app.py's call (stream_chatbot_reply with paginate and hedge) against a
+    primary LLM that streams after slow seconds and one that answers at
+    once. Returns the failures as text; [] when the slow one lost to the
+    local answer within the deadline and the fast one won.
+    """
+    from local_engine import LocalDatabase
+    import llm_cache
+    import result_cache
+
+    db = LocalDatabase(dataset)
+    with offline_imports(db):
+        import chatbot
+    chatbot.pool = db
+    os.environ["CHATBOT_HEDGE_DEADLINE"] = str(deadline)
+    result_cache._default_cache = result_cache.ResultCache(max_entries=0)
+
+    failures = []
+    # The fast case first: a later identical question would join the slow call still in flight
+    for delay, expected in ((0.0, "llm"), (slow, "local")):
+        llm_cache._default_cache = llm_cache.LLMCache(path=None, max_entries=0)
+        chatbot.client = SlowStreamingGroq(delay)
+        started = time.perf_counter()
+        events = list(chatbot.stream_chatbot_reply(HEDGE_QUESTION, filepath=dataset, paginate=True, hedge=True))
+        seconds = time.perf_counter() - started
+        reply = events[-1]["reply"]
+        tokens = sum(event["event"] == "sql_token" for event in events)
+        print(f"  LLM after {delay:.1f}s: hedge={reply.get('hedge')} path={reply['path']} "
+              f"{tokens} streamed tokens, {seconds:.2f}s", file=sys.stderr)
+        if reply.get("hedge") != expected:
+            failures.append(f"LLM after {delay}s: hedge {reply.get('hedge')!r}, expected {expected!r}")
+        if expected == "local" and seconds >= slow:
+            failures.append(f"local answer took {seconds:.2f}s, not under the {slow}s LLM delay")
+        if expected == "llm" and not tokens:
+            failures.append("the winning LLM answer was not streamed")
+    return failures
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline_path, threshold=1.5):
+    """Print per-stage p50/p95 ratios against an earlier run; returns stages slower than threshold"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = []
+    for scale, result in current["scales"].items():
+        old = baseline.get("scales", {}).get(scale)
+        if not old:
+            continue
+        for stage, stats in result["stages"].items():
+            old_stats = old["stages"].get(stage)
+            if not old_stats or not old_stats["p50_us"]:
+                continue
+            p50 = stats["p50_us"] / old_stats["p50_us"]
+            p95 = stats["p95_us"] / old_stats["p95_us"] if old_stats["p95_us"] else 0.0
+            flag = "⚠️" if p50 > threshold else "  "
+            print(f"{flag} x{scale:<6} {stage:<30} p50 {p50:5.2f}x  p95 {p95:5.2f}x")
+            if p50 > threshold:
+                regressions.append((scale, stage, p50))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Offline per-stage benchmark of the chatbot pipeline. Groq is replaced by a stub "
+                    "client and PostgreSQL by the local engine (local_engine.py) over the dataset, replicated "
+                    "to each scale factor. Results are saved as JSON; pass an earlier file to --compare to spot "
+                    "regressions between commits.")
+    parser.add_argument("--dataset", default="hospital_dataset.csv")
+    parser.add_argument("--scales", default="1,100,10000", help="comma-separated dataset scale factors")
+    parser.add_argument("--iterations", type=int, default=500, help="max calls per stage")
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="time budget per stage")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.5, help="p50 slowdown ratio that counts as a regression")
+    parser.add_argument("--postgres", action="store_true",
+                        help="also time the execute stage on the Postgres server from .env / DB_*")
+    parser.add_argument("--check-hedge", action="store_true",
+                        help="only check that app.py's streaming call hedges a slow LLM, then exit")
+    args = parser.parse_args()
+
+    if args.check_hedge:
+        failures = check_hedge(args.dataset)
+        for failure in failures:
+            print(f"❌ {failure}", file=sys.stderr)
+        raise SystemExit(1 if failures else 0)
+
+    postgres = None
+    if args.postgres:
+        from dotenv import load_dotenv
+        from db import pool_from_env
+        load_dotenv()
+        postgres = pool_from_env()
+
+    with open(args.dataset, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames
+        base_rows = list(reader)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "dataset": args.dataset,
+        "scales": {},
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in (int(s) for s in args.scales.split(",")):
+            print(f"📊 scale x{scale} ({len(base_rows) * scale} rows)", file=sys.stderr)
+            report["scales"][str(scale)] = run_scale(scale, base_rows, fieldnames, args.iterations,
+                                                     args.max_seconds, workdir, postgres)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results saved to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        regressions = compare(report, args.compare, args.threshold)
+        sys.exit(1 if regressions else 0)
@@ -1,107 +1,125 @@
 import os
-import psycopg2
 import json
 import re
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from groq import Groq
 from thefuzz import process
-import psycopg2.extras
-
-
-# -------------------- Load Environment Variables --------------------
-load_dotenv(dotenv_path="c:/Users/Sachi/OneDrive/Documents/Python Scripts/.env")
+from llm_cache import get_cache
+from result_cache import get_result_cache
+from db import pool_from_env
+from fast_path import extract_slots, detect_intent, fuzzy_intent, build_sql, render_sql
+from intent_classifier import classify, is_out_of_scope
+import metrics
+import prepared
+import prompts
+from metrics import StageTimer
+from singleflight import SingleFlight
+
+
+# -------------------- Lazy Resources --------------------
+# Nothing here does I/O at import time; the .env file, the Groq client, the
+# Postgres pool and the metrics exporters are set up on first use.
+ENV_PATH = "c:/Users/Sachi/OneDrive/Documents/Python Scripts/.env"
+LLAMA_MODEL = "llama-3.1-8b-instant"
+
+client = None
+pool = None
+hedge_executor = None
+hedge_slots = None
+_env_loaded = False
+_init_lock = threading.Lock()
+
+
+def load_env():
+    """Load environment variables and start the metrics exporters, once"""
+    global _env_loaded
+    if _env_loaded:
+        return
+    with _init_lock:
+        if not _env_loaded:
+            load_dotenv(dotenv_path=ENV_PATH)
+            _env_loaded = True
+    # Prometheus-style metrics (CHATBOT_METRICS=1, exported via CHATBOT_METRICS_PORT / CHATBOT_METRICS_FILE)
+    metrics.start_exporters_from_env()
+
+
+def get_client():
+    """Groq client, created on first use (groq itself is imported lazily too)"""
+    global client
+    if client is None:
+        load_env()
+        with _init_lock:
+            if client is None:
+                from groq import Groq
+                client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+    return client
+
+
+def use_local_backend():
+    load_env()
+    return os.getenv("CHATBOT_BACKEND", "postgres").lower() == "local"
+
+
+def get_pool():
+    """
+    PostgreSQL connection pool (one connection checked out per request), or
+    with CHATBOT_BACKEND=local the in-process engine built from LOCAL_DATASET.
+    """
+    global pool
+    if pool is None:
+        load_env()
+        with _init_lock:
+            if pool is None:
+                if use_local_backend():
+                    from local_engine import LocalDatabase
+                    pool = LocalDatabase(os.getenv("LOCAL_DATASET", "hospital_dataset.csv"))
+                else:
+                    pool = pool_from_env()
+    return pool
+
+
+def get_hedge_executor():
+    """
+    Worker threads for LLM calls hedged against a local answer
+    (CHATBOT_HEDGE_WORKERS). hedge_slots holds one permit per worker, so
+    nothing queues behind late calls that are still running.
+    """
+    global hedge_executor, hedge_slots
+    if hedge_executor is None:
+        load_env()
+        with _init_lock:
+            if hedge_executor is None:
+                workers = int(os.getenv("CHATBOT_HEDGE_WORKERS", "8"))
+                hedge_slots = threading.BoundedSemaphore(workers)
+                hedge_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hedge")
+    return hedge_executor
 
 
+def hedge_deadline():
+    """Seconds a hedged reply waits for the LLM before answering locally (CHATBOT_HEDGE_DEADLINE, 0 = off)"""
+    load_env()
+    return float(os.getenv("CHATBOT_HEDGE_DEADLINE", "2.0"))
 
-# Initialize Groq client
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
 
+metrics.registry.register_gauges("chatbot_db_pool", lambda: pool.stats() if pool is not None else {})
+metrics.registry.register_gauges("chatbot_llm_cache", lambda: get_cache().stats())
+metrics.registry.register_gauges("chatbot_result_cache", lambda: get_result_cache().stats())
 
-# Connect to PostgreSQL
-conn = psycopg2.connect(
-    dbname=os.getenv("DB_NAME"),
-    user=os.getenv("DB_USER"),
-    password=os.getenv("DB_PASSWORD"),
-    host=os.getenv("DB_HOST"),
-    port=os.getenv("DB_PORT")
-)
-cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+# Identical questions asked at the same time (every session polling the same
+# hospital after an availability change) share one LLM call, keyed on the
+# normalized question, and one query execution, keyed on SQL + parameters.
+llm_flights = SingleFlight()
+query_flights = SingleFlight()
+metrics.registry.register_gauges("chatbot_singleflight_llm", llm_flights.stats)
+metrics.registry.register_gauges("chatbot_singleflight_query", query_flights.stats)
 
 
 # -------------------- Prompt Template --------------------
-SYSTEM_PROMPT='''
-You are a hospital-doctor information assistant.  
-Your job is to convert user questions into SQL queries, execute them,  
-and then return a polite natural-language answer.
-
-You must strictly follow these rules:
-
-1. Input: User will ask about hospitals, doctors, symptoms, specialties, beds, or availability.  
-2. Output: You MUST return ONLY a valid SQL SELECT query (no explanations, no extra text).  
-3. Always query using ONLY these tables:  
-   - hospital_doctor_data(hospital_name, area, doctor_name, specialty, experience_years, availability, available_beds)  
-   - symptom_specialty(symptom_keyword, specialty)  
-4. Table and column names MUST NOT be altered, misspelled, or changed in any way. Use the names exactly as above.  
-5. If the input is ambiguous or unclear, make the best guess to construct a logically valid SQL query.  
-6. The query must ALWAYS limit the results to MAX 3 rows.  
-7. If the user query implies available doctors or availability (keywords like "available", "free", "now", "open"),  
-   always add "AND availability = TRUE" in the SQL WHERE clause.  
-8. For text comparisons such as 'specialty' or 'symptom_keyword', use case-insensitive matching with ILIKE, e.g.:  
-   SELECT ... FROM hospital_doctor_data WHERE specialty ILIKE '<specialty>' LIMIT 3;  
-9. Do NOT include any column or table not specified above.  
-10. You should ONLY focus on medical-related replies. Do NOT provide answers unrelated to medical, hospital, doctor, symptoms, or specialties.  
-11. If a symptom from a user query is NOT found in the database, you MUST infer or fetch medically relevant information on your own to provide a helpful answer.
-12. If user asks for many/all doctors/hospitals, do NOT use LIMIT. Only limit when the query is specific.
-13. Always return a SQL SELECT query.
-14. Always use medically relevant fallback if results are absent.  
-
---------------------  
-DATABASE SCHEMA  
---------------------  
-Table: hospital_doctor_data  
-   - hospital_name TEXT  
-   - area TEXT  
-   - doctor_name TEXT  
-   - specialty TEXT  
-   - experience_years INT  
-   - availability TEXT  
-   - available_beds INT  
-
-Table: symptom_specialty  
-   - symptom_keyword TEXT  
-   - specialty TEXT  
-
---------------------  
-TASK  
---------------------  
-1. Carefully understand the user query and map it to the correct SQL SELECT statement using ONLY the above tables and columns.  
-2. Return ONLY the SQL SELECT query, without any additional text or explanation.  
-3. Use proper PostgreSQL syntax, respecting case insensitivity and the required availability filter.  
-4. Ensure your SQL queries are syntactically correct and executable.  
-5. When symptoms are missing in the database, do NOT return empty results—use your medical knowledge to infer or provide relevant information.  
-
------------------------  
-EXAMPLES  
------------------------  
-
-Example (Doctor query):  
-SELECT doctor_name, specialty, experience_years, availability, hospital_name  
-FROM hospital_doctor_data  
-WHERE doctor_name = '<doctor_name>'  
-LIMIT 3;  
-
-Example (Hospital query):  
-SELECT doctor_name, specialty, experience_years, availability, hospital_name  
-FROM hospital_doctor_data  
-WHERE hospital_name = '<hospital_name>'  
-LIMIT 3;  
-
-Example (Symptom query):  
-SELECT doctor_name, specialty, experience_years, availability, hospital_name  
-FROM hospital_doctor_data  
-WHERE specialty IN (SELECT specialty FROM symptom_specialty WHERE symptom_keyword = '<symptom>')  
-LIMIT 3;  
-'''
+# Profiles live in prompts.py; SYSTEM_PROMPT is the full one
+SYSTEM_PROMPT = prompts.SYSTEM_PROMPT
 
 
 def normalize_input(user_query: str) -> str:
@@ -112,17 +130,98 @@ def normalize_input(user_query: str) -> str:
     return text.strip()
 
 
-def ask_llama(user_query: str) -> str:
-    """Send user query to Groq (LLaMA) and return response"""
-    response = client.chat.completions.create(
-        model="llama-3.1-8b-instant",
+def ask_llama(user_query: str, usage=None, intent=None) -> str:
+    """
+    Send user query to Groq (LLaMA) and return response (cached, since temperature=0 is deterministic).
+    The system prompt comes from the CHATBOT_PROMPT_PROFILE profile (prompts.py); intent picks
+    its few-shot example. If a usage dict is passed it is filled with the token counts of the call.
+    """
+    load_env()  # LLM_CACHE_* / CHATBOT_PROMPT_PROFILE may come from .env
+    profile = prompts.prompt_profile()
+    system_prompt = prompts.system_prompt(profile, intent)
+
+    def call():
+        started = time.perf_counter()
+        response = get_client().chat.completions.create(
+            model=LLAMA_MODEL,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_query}
+            ],
+            temperature=0  # deterministic SQL
+        )
+        record_usage(response, usage, profile, time.perf_counter() - started)
+        return response.choices[0].message.content.strip()
+
+    if usage is not None:
+        usage.update(cached=True, profile=profile)
+    return get_cache().get_or_call(LLAMA_MODEL, system_prompt, user_query, call)
+
+
+def stream_llama(user_query: str, usage=None, intent=None):
+    """
+    ask_llama as a generator of text chunks. A cached answer is yielded in
+    one piece; otherwise tokens are yielded as Groq streams them and the
+    complete answer is cached.
+    """
+    load_env()
+    profile = prompts.prompt_profile()
+    system_prompt = prompts.system_prompt(profile, intent)
+    if usage is not None:
+        usage["profile"] = profile
+    cache = get_cache()
+    cached = cache.get(LLAMA_MODEL, system_prompt, user_query)
+    if cached is not None:
+        if usage is not None:
+            usage["cached"] = True
+        yield cached
+        return
+
+    started = time.perf_counter()
+    stream = get_client().chat.completions.create(
+        model=LLAMA_MODEL,
         messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_query}
         ],
-        temperature=0  # deterministic SQL
+        temperature=0,  # deterministic SQL
+        stream=True
     )
-    return response.choices[0].message.content.strip()
+    parts = []
+    x_groq = None
+    for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            parts.append(delta)
+            yield delta
+        # Groq reports token usage on the last chunk
+        if getattr(getattr(chunk, "x_groq", None), "usage", None) is not None:
+            x_groq = chunk.x_groq
+    if x_groq is not None:
+        record_usage(x_groq, usage, profile, time.perf_counter() - started)
+    cache.set(LLAMA_MODEL, system_prompt, user_query, "".join(parts).strip())
+
+
+def record_usage(response, usage=None, profile=None, seconds=None):
+    """
+    Copy token counts (and the call's latency) from a Groq response into
+    usage and the per-profile token / latency metrics
+    """
+    tokens = getattr(response, "usage", None)
+    if tokens is None:
+        return
+    profile = profile or "full"
+    prompt_tokens = getattr(tokens, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(tokens, "completion_tokens", 0) or 0
+    metrics.inc("chatbot_llm_tokens_total", prompt_tokens, kind="prompt", profile=profile)
+    metrics.inc("chatbot_llm_tokens_total", completion_tokens, kind="completion", profile=profile)
+    if seconds is not None:
+        metrics.observe("chatbot_llm_seconds", seconds, profile=profile)
+    if usage is not None:
+        usage.update(cached=False, profile=profile, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                     total_tokens=prompt_tokens + completion_tokens)
+        if seconds is not None:
+            usage["llm_ms"] = round(seconds * 1000, 3)
 
 
 def fuzzy_match(user_input, column_values):
@@ -159,6 +258,25 @@ def format_results(results, query_type="doctor"):
                 f"is available at {hospital_name}. Current status: {availability}."
             )
 
+    elif query_type == "hospital" and "total_doctors" in results[0]:
+        # One row per hospital from hospital_summary
+        for row in results[:3]:
+            hospital_name = row.get("hospital_name", "Unknown Hospital")
+            area = row.get("area", "Unknown Area")
+            available_beds = row.get("available_beds", "N/A")
+            by_specialty = row.get("available_by_specialty") or {}
+            if isinstance(by_specialty, str):
+                by_specialty = json.loads(by_specialty)
+            open_specialties = ", ".join(
+                f"{name} ({count})" for name, count in sorted(by_specialty.items(), key=lambda item: -item[1]) if count
+            )
+
+            response.append(
+                f"🏥 {hospital_name} ({area}) currently has {available_beds} beds and "
+                f"{row.get('available_doctors', 0)} of {row.get('total_doctors', 0)} doctors available."
+                + (f" Available now: {open_specialties}." if open_specialties else "")
+            )
+
     elif query_type == "hospital":
         for row in results[:3]:
             hospital_name = row.get("hospital_name", "Unknown Hospital")
@@ -192,43 +310,40 @@ def format_results(results, query_type="doctor"):
     return "\n\n".join(response)
 
 
-def get_chatbot_reply(user_query, filepath):
-    clean_query = normalize_input(user_query)
-    availability_filter = any(word in clean_query for word in ["available", "availability", "currently available", "free", "open", "now"])
+_HAS_LIMIT = re.compile(r"\bLIMIT\s+\d+\s*;?\s*$", re.I)
 
-    llama_output = ask_llama(clean_query)
-    sql_query = llama_output.strip()
 
-    # Make specialty and symptom_keyword filters case-insensitive
-    sql_query = re.sub(r"specialty\s*=\s*'([^']*)'", r"specialty ILIKE '\1'", sql_query, flags=re.I)
-    sql_query = re.sub(r"symptom_keyword\s*=\s*'([^']*)'", r"symptom_keyword ILIKE '\1'", sql_query, flags=re.I)
+def rewrite_sql(llama_output, availability_filter, paginate=False):
+    """
+    Post-process LLM SQL: lower()-indexable text filters, the availability
+    filter on hospital_doctor_data and a row cap. None if it is not a SELECT.
+    """
+    import sql_rewrite  # sqlglot is only needed once a question reaches the LLM path
+    return sql_rewrite.rewrite(llama_output, availability_filter, paginate=paginate)
 
-    # Add availability filter if applicable
-    if availability_filter and "availability" not in sql_query.lower():
-        if "where" in sql_query.lower():
-            sql_query = re.sub(r"where", "WHERE availability = TRUE AND ", sql_query, flags=re.I, count=1)
-        else:
-            sql_query = re.sub(r"limit", "WHERE availability = TRUE LIMIT", sql_query, flags=re.I, count=1)
 
-    if not sql_query.lower().startswith("select"):
-        return {
-            "sql_query": sql_query,
-            "result": "⚠️ Sorry, generated output is not a valid SELECT SQL query.",
-            "rows": [],
-            "nlp_suggestion": ""
-        }
+def invalid_sql_reply(sql_query, path):
+    return {
+        "sql_query": sql_query,
+        "result": "⚠️ Sorry, generated output is not a valid SELECT SQL query.",
+        "rows": [],
+        "nlp_suggestion": "",
+        "path": path
+    }
 
-    cur.execute(sql_query)
-    rows = cur.fetchall()
 
-    # Detect query type from user input
-    if any(word in clean_query for word in ["hospital", "hospitals", "beds"]):
-        query_type = "hospital"
-    elif any(word in clean_query for word in ["fever", "pain", "headache", "symptom", "symptoms"]):
-        query_type = "symptom"
-    else:
-        query_type = "doctor"
+def out_of_scope_reply(path):
+    return {
+        "sql_query": "",
+        "result": "⚠️ I can only help with questions about doctors, hospitals, symptoms, specialties and availability.",
+        "rows": [],
+        "nlp_suggestion": "Try asking something like \"Which cardiologist is available at PSG Hospitals?\"",
+        "path": path
+    }
+
 
+def build_reply(sql_query, params, rows, query_type, path):
+    """Format rows and assemble the reply dict returned to app.py"""
     response_text = format_results(rows, query_type=query_type)
 
     # Optionally use NLP fallback if no results (dummy example)
@@ -238,13 +353,313 @@ def get_chatbot_reply(user_query, filepath):
 
     # Return dictionary with all relevant outputs
     return {
-        "sql_query": sql_query,
+        "sql_query": render_sql(sql_query, params) if params else sql_query,
         "result": response_text,
         "rows": rows,
-        "nlp_suggestion": nlp_suggestion
+        "nlp_suggestion": nlp_suggestion,
+        "path": path
     }
 
 
+def detect_query_type(clean_query):
+    """Keyword fallback for query type when the classifier is unsure"""
+    if any(word in clean_query for word in ["hospital", "hospitals", "beds"]):
+        return "hospital"
+    elif any(word in clean_query for word in ["fever", "pain", "headache", "symptom", "symptoms"]):
+        return "symptom"
+    return "doctor"
+
+
+def generate_sql(clean_query, usage, stream_llm=True, intent=None):
+    """
+    LLM output for a normalized question: yields sql_token events while it
+    streams and returns the whole output. If the same question is already
+    with the LLM, waits for that call and yields its output in one piece.
+    """
+    flight, leader = llm_flights.begin(clean_query)
+    if not leader:
+        metrics.inc("chatbot_coalesced_total", stage="llm")
+        llama_output = flight.wait()
+        if stream_llm:
+            yield {"event": "sql_token", "text": llama_output}
+        return llama_output
+
+    try:
+        if stream_llm:
+            parts = []
+            for text in stream_llama(clean_query, usage, intent):
+                parts.append(text)
+                yield {"event": "sql_token", "text": text}
+            llama_output = "".join(parts).strip()
+        else:
+            llama_output = ask_llama(clean_query, usage, intent)
+    except BaseException as e:
+        llm_flights.fail(clean_query, flight, e)
+        raise
+    llm_flights.finish(clean_query, flight, llama_output)
+    return llama_output
+
+
+def run_cached(sql_query, params):
+    """
+    Rows for a rewritten query from the result cache (keyed on canonical
+    SQL, dropped when the chatbot tables change), else from the database
+    """
+    db = get_pool()
+    return get_result_cache().get_or_run(sql_query, params, lambda: run_coalesced(sql_query, params), db.data_version)
+
+
+def run_coalesced(sql_query, params):
+    """prepared.run, shared with an identical query that is already running"""
+    key = (sql_query, tuple(params or ()))
+    flight, leader = query_flights.begin(key)
+    if not leader:
+        metrics.inc("chatbot_coalesced_total", stage="execute")
+        return flight.wait()
+    try:
+        rows = prepared.run(get_pool(), sql_query, params)
+    except BaseException as e:
+        query_flights.fail(key, flight, e)
+        raise
+    query_flights.finish(key, flight, rows)
+    return rows
+
+
+def submit_hedged(fn, *args):
+    """fn(*args) on a hedge worker, or None when every worker is busy"""
+    executor = get_hedge_executor()
+    if not hedge_slots.acquire(blocking=False):
+        return None
+    try:
+        future = executor.submit(fn, *args)
+    except BaseException:
+        hedge_slots.release()
+        raise
+    future.add_done_callback(lambda _: hedge_slots.release())
+    return future
+
+
+def local_answer(local_intent):
+    sql_query, params = build_sql(local_intent)
+    return sql_query, params, run_cached(sql_query, params)
+
+
+def hedge_llm(clean_query, usage, local_intent, deadline, intent=None):
+    """
+    Ask the LLM on a worker thread and wait for it until deadline; only
+    then run the local template answer. Returns (winner, llama_output,
+    local) with winner "llm", "local" or "skipped" and local = (sql,
+    params, rows) when the local side won. A late LLM call keeps running
+    and fills llm_cache, so the next identical question gets the LLM's
+    SQL. When every hedge worker is busy the LLM is asked inline instead
+    ("skipped").
+    """
+    llm_usage = {}
+    future = submit_hedged(llm_flights.do, clean_query, ask_llama, clean_query, llm_usage, intent)
+    if future is None:
+        return "skipped", llm_flights.do(clean_query, ask_llama, clean_query, usage, intent), None
+
+    try:
+        llama_output = future.result(timeout=deadline)
+    except Exception:
+        # Late, or a failed LLM call, which is not an answer either
+        return "local", None, local_answer(local_intent)
+    usage.update(llm_usage)
+    return "llm", llama_output, None
+
+
+def hedge_stream(clean_query, usage, local_intent, deadline, intent=None):
+    """
+    hedge_llm for a streaming caller: yields sql_token events and returns
+    (winner, llama_output, local). The LLM streams on a worker thread; if
+    its first token arrives before deadline the tokens are passed on as
+    they come and the LLM wins, otherwise the local answer does and the
+    rest of the stream only fills llm_cache.
+    """
+    events, llm_usage = queue.Queue(), {}
+
+    def pump():
+        tokens = generate_sql(clean_query, llm_usage, True, intent)
+        try:
+            while True:
+                events.put(("token", next(tokens)))
+        except StopIteration as done:
+            events.put(("done", done.value))
+        except Exception as e:
+            events.put(("error", e))
+
+    if submit_hedged(pump) is None:
+        llama_output = yield from generate_sql(clean_query, usage, True, intent)
+        return "skipped", llama_output, None
+
+    try:
+        kind, value = events.get(timeout=deadline)
+    except queue.Empty:
+        kind, value = "late", None
+    if kind in ("late", "error"):
+        return "local", None, local_answer(local_intent)
+    while kind == "token":
+        yield value
+        kind, value = events.get()
+    if kind == "error":
+        raise value
+    usage.update(llm_usage)
+    return "llm", value, None
+
+
+def stream_chatbot_reply(user_query, filepath, stream_llm=True, paginate=False, hedge=False):
+    """
+    get_chatbot_reply as a generator of events, so a UI can show each part
+    as soon as it exists:
+      {"event": "sql_token", "text": ...}   LLM output while it streams (LLM path only)
+      {"event": "sql", "sql_query": ..., "path": ...}
+      {"event": "rows", "rows": [...], "pages": ...}
+      {"event": "text", "text": ...}        one paragraph of the answer
+      {"event": "done", "reply": {...}}     the same dict get_chatbot_reply returns
+
+    With paginate, a query without LIMIT is not capped at MAX_ROWS: "rows"
+    is its first page and "pages" a db.ResultPages handle for the rest
+    (None when everything fit in the first page). The caller should
+    close() the handle when done with it.
+
+    With hedge, a question that needs the LLM but also fuzzily resolves to
+    a symptom or hospital is answered locally when the LLM misses
+    hedge_deadline(): with stream_llm its first token must arrive by then,
+    otherwise its whole answer. reply["hedge"] records which side won.
+    """
+    timer = StageTimer()
+    usage = {}
+    rows, winner = None, None
+
+    with timer.span("normalize"):
+        clean_query = normalize_input(user_query)
+        availability_filter = any(word in clean_query for word in ["available", "availability", "currently available", "free", "open", "now"])
+
+    # Doctor / hospital / symptom questions are answered from SQL templates without the LLM
+    with timer.span("fuzzy"):
+        slots = extract_slots(clean_query, filepath)
+        intent = detect_intent(clean_query, filepath, slots)
+    if intent:
+        path = "template"
+        sql_query, params = build_sql(intent, paginate)
+        query_type = intent["query_type"]
+    else:
+        # Decided before the LLM call: off-topic input never reaches the model
+        with timer.span("classify"):
+            prediction = classify(clean_query, filepath, slots)
+        if is_out_of_scope(prediction):
+            path = "out_of_scope"
+            reply = out_of_scope_reply(path)
+            reply.update(timings=timer.finish(path), usage=usage)
+            yield {"event": "done", "reply": reply}
+            return
+
+        path = "llm"
+        params = None
+        query_type = prediction["intent"] if prediction["intent"] != "out_of_scope" else detect_query_type(clean_query)
+        local_intent = None
+        if hedge and hedge_deadline() > 0:
+            local_intent = fuzzy_intent(clean_query, filepath, slots)
+        if local_intent:
+            # The LLM answer wins if it arrives before the deadline, the local template answer otherwise
+            with timer.span("hedge"):
+                if stream_llm:
+                    winner, llama_output, local = yield from hedge_stream(
+                        clean_query, usage, local_intent, hedge_deadline(), query_type)
+                else:
+                    winner, llama_output, local = hedge_llm(clean_query, usage, local_intent, hedge_deadline(), query_type)
+            metrics.inc("chatbot_hedge_total", winner=winner)
+        else:
+            # When streaming, the llm stage also includes the time the consumer spends on each token
+            with timer.span("llm"):
+                llama_output = yield from generate_sql(clean_query, usage, stream_llm, query_type)
+
+        if winner == "local":
+            path = "local_hedge"
+            sql_query, params, rows = local
+            query_type = local_intent["query_type"]
+        else:
+            with timer.span("sql_rewrite"):
+                sql_query = rewrite_sql(llama_output, availability_filter, paginate)
+
+            if sql_query is None:
+                reply = invalid_sql_reply(llama_output, path)
+                reply.update(timings=timer.finish(path), usage=usage)
+                yield {"event": "done", "reply": reply}
+                return
+
+    yield {"event": "sql", "sql_query": render_sql(sql_query, params) if params else sql_query, "path": path}
+
+    pages = None
+    # rows is already set when the local side of a hedge won
+    if rows is None:
+        with timer.span("execute"):
+            if paginate and not _HAS_LIMIT.search(sql_query):
+                # Unlimited: read one keyset page at a time (db.ResultPages)
+                pages = get_pool().pages(sql_query, params)
+                rows = pages.page(0)
+                if not pages.has_next(0):
+                    pages = None
+            else:
+                # Known query shapes run as prepared statements with bound literals;
+                # hot results come from the result cache, and a miss is shared
+                # with identical concurrent requests
+                rows = run_cached(sql_query, params)
+    metrics.observe("chatbot_result_rows", len(rows), buckets=metrics.COUNT_BUCKETS, path=path)
+    yield {"event": "rows", "rows": rows, "pages": pages}
+
+    with timer.span("format"):
+        reply = build_reply(sql_query, params, rows, query_type, path)
+    reply.update(timings=timer.finish(path), usage=usage)
+    if winner:
+        reply["hedge"] = winner
+    if paginate:
+        reply["pages"] = pages
+    for paragraph in reply["result"].split("\n\n"):
+        yield {"event": "text", "text": paragraph}
+    yield {"event": "done", "reply": reply}
+
+
+def get_chatbot_reply(user_query, filepath, hedge=True):
+    """
+    The finished reply for one question. hedge suits interactive use;
+    bulk runs pass hedge=False so a slow LLM call is waited for rather than
+    replaced by the local answer.
+    """
+    for event in stream_chatbot_reply(user_query, filepath, stream_llm=False, hedge=hedge):
+        if event["event"] == "done":
+            return event["reply"]
+
+
+def get_chatbot_replies(queries, filepath="hospital_dataset.csv", concurrency=8):
+    """
+    Answer many questions with bounded concurrency.
+    Questions that normalize to the same text are answered once; replies
+    come back in input order. A failed question yields a reply with an
+    "error" key instead of aborting the batch.
+    """
+    unique = {}
+    for query in queries:
+        unique.setdefault(normalize_input(query), query)
+
+    def answer(query):
+        try:
+            return get_chatbot_reply(query, filepath, hedge=False)
+        except Exception as e:
+            return {
+                "sql_query": "",
+                "result": f"❌ Unexpected error: {e}",
+                "rows": [],
+                "nlp_suggestion": "",
+                "path": "error",
+                "error": str(e)
+            }
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        answers = dict(zip(unique, executor.map(answer, unique.values())))
+    return [dict(answers[normalize_input(query)]) for query in queries]
+
+
 if __name__ == "__main__":
     print("🤖 Medical Assistant Ready! Ask me about hospitals, doctors, or symptoms.")
     while True:
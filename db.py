@@ -0,0 +1,485 @@
+import os
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import psycopg2
+import psycopg2.errors
+import psycopg2.extras
+import psycopg2.pool
+
+
+# -------------------- Connection Settings --------------------
+# Upper bound on the rows any chatbot query may return in one piece
+MAX_ROWS = int(os.getenv("SQL_MAX_ROWS", "100"))
+# Unlimited queries are read one page of this many rows at a time
+PAGE_SIZE = int(os.getenv("SQL_PAGE_SIZE", "50"))
+# Tables and views chatbot answers are read from; a write to (or refresh of)
+# any of them invalidates cached results
+DATA_TABLES = ("hospital_doctor_data", "symptom_specialty", "hospital_summary")
+
+
+def connect_kwargs():
+    """Read the PostgreSQL connection settings from the environment"""
+    return {
+        "dbname": os.getenv("DB_NAME"),
+        "user": os.getenv("DB_USER"),
+        "password": os.getenv("DB_PASSWORD"),
+        "host": os.getenv("DB_HOST"),
+        "port": os.getenv("DB_PORT"),
+    }
+
+
+def dollar_placeholders(sql):
+    """psycopg2 %s placeholders → server-side $1, $2, ..."""
+    counter = iter(range(1, sql.count("%s") + 1))
+    return re.sub(r"%s", lambda _: f"${next(counter)}", sql)
+
+
+def statement_name(sql):
+    return "stmt_" + hashlib.sha1(sql.encode("utf-8")).hexdigest()[:16]
+
+
+# -------------------- Connection Pool --------------------
+class ConnectionPool:
+    """
+    Thread-safe PostgreSQL pool.
+    Every request checks out its own connection, so concurrent Streamlit
+    sessions never share a cursor. Connections run read-only in autocommit
+    mode; a connection that errors is rolled back, and a broken one is
+    closed and replaced on the next checkout.
+    """
+
+    def __init__(self, minconn=1, maxconn=10, timeout=30.0, max_prepared=64, **connect_args):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("pool size must satisfy 0 <= minconn <= maxconn and maxconn >= 1")
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_prepared = max_prepared
+        self.connect_args = connect_args or connect_kwargs()
+        self._idle = []
+        self._prepared = {}  # id(conn) → OrderedDict of statement names prepared on it
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._opened = False
+        self._stats = {
+            "checkouts": 0,
+            "in_use": 0,
+            "connections_opened": 0,
+            "connections_discarded": 0,
+            "errors": 0,
+            "reconnects": 0,
+            "timeouts": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "checkout_seconds_total": 0.0,
+            "checkout_seconds_max": 0.0,
+            "prepares": 0,
+            "prepared_executions": 0,
+            "deallocations": 0,
+        }
+
+    def _connect(self):
+        conn = psycopg2.connect(**self.connect_args)
+        conn.set_session(readonly=True, autocommit=True)
+        with self._lock:
+            self._stats["connections_opened"] += 1
+        return conn
+
+    def _open(self):
+        """Open the minimum number of connections on first use"""
+        with self._lock:
+            if self._opened:
+                return
+            self._opened = True
+        conns = [self._connect() for _ in range(self.minconn)]
+        with self._lock:
+            self._idle.extend(conns)
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        with self._lock:
+            self._prepared.pop(id(conn), None)
+            self._stats["connections_discarded"] += 1
+
+    def _release(self, conn, broken=False):
+        if broken or conn.closed:
+            self._discard(conn)
+        else:
+            with self._lock:
+                if len(self._idle) < self.maxconn:
+                    self._idle.append(conn)
+                    conn = None
+            if conn is not None:
+                self._discard(conn)
+        self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of one request"""
+        if not self._opened:
+            self._open()
+
+        wait_started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise psycopg2.pool.PoolError(f"no connection available within {self.timeout}s")
+        waited = time.perf_counter() - wait_started
+
+        conn = None
+        try:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None or conn.closed:
+                conn = self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["in_use"] += 1
+            self._stats["wait_seconds_total"] += waited
+            self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], waited)
+
+        checked_out = time.perf_counter()
+        broken = False
+        try:
+            yield conn
+        except psycopg2.Error as e:
+            broken = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+            with self._lock:
+                self._stats["errors"] += 1
+            if not broken and not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+            raise
+        finally:
+            held = time.perf_counter() - checked_out
+            with self._lock:
+                self._stats["in_use"] -= 1
+                self._stats["checkout_seconds_total"] += held
+                self._stats["checkout_seconds_max"] = max(self._stats["checkout_seconds_max"], held)
+            self._release(conn, broken=broken)
+
+    def run_query(self, sql, params=None, retries=1):
+        """
+        Execute a read-only query and return all rows as dicts.
+        Retries on a fresh connection if the server dropped the old one.
+        """
+        for attempt in range(retries + 1):
+            try:
+                with self.connection() as conn:
+                    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                        cur.execute(sql, params)
+                        return cur.fetchall()
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                if attempt == retries:
+                    raise
+                with self._lock:
+                    self._stats["reconnects"] += 1
+
+    def run_prepared(self, sql, params=(), retries=1):
+        """
+        Execute sql (with %s placeholders) through a named server-side prepared
+        statement, so Postgres parses and plans it once per pooled connection.
+        The least recently used statements are deallocated past max_prepared.
+        """
+        name = statement_name(sql)
+        params = list(params or ())
+        execute_sql = f"EXECUTE {name}({', '.join(['%s'] * len(params))})" if params else f"EXECUTE {name}"
+        for attempt in range(retries + 1):
+            try:
+                with self.connection() as conn:
+                    with self._lock:
+                        prepared = self._prepared.setdefault(id(conn), OrderedDict())
+                    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                        if name in prepared:
+                            prepared.move_to_end(name)
+                        else:
+                            cur.execute(f"PREPARE {name} AS {dollar_placeholders(sql.strip().rstrip(';'))}")
+                            prepared[name] = True
+                            with self._lock:
+                                self._stats["prepares"] += 1
+                            while len(prepared) > self.max_prepared:
+                                old_name, _ = prepared.popitem(last=False)
+                                cur.execute(f"DEALLOCATE {old_name}")
+                                with self._lock:
+                                    self._stats["deallocations"] += 1
+                        try:
+                            cur.execute(execute_sql, params)
+                        except psycopg2.errors.InvalidSqlStatementName:
+                            # The server forgot it (DISCARD ALL, pooler reset); prepare again next time
+                            prepared.clear()
+                            raise
+                        with self._lock:
+                            self._stats["prepared_executions"] += 1
+                        return cur.fetchall()
+            except (psycopg2.OperationalError, psycopg2.InterfaceError, psycopg2.errors.InvalidSqlStatementName):
+                if attempt == retries:
+                    raise
+                with self._lock:
+                    self._stats["reconnects"] += 1
+
+    def pages(self, sql, params=None, page_size=PAGE_SIZE):
+        """Read sql page by page (see ResultPages)"""
+        return ResultPages(self, sql, params, page_size)
+
+    def data_version(self, tables=DATA_TABLES):
+        """table_version of tables, read on a pooled connection"""
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                return table_version(cur, tables)
+
+    def stats(self):
+        """Snapshot of pool-wait and checkout metrics"""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["idle"] = len(self._idle)
+        checkouts = snapshot["checkouts"] or 1
+        snapshot["wait_seconds_avg"] = snapshot["wait_seconds_total"] / checkouts
+        snapshot["checkout_seconds_avg"] = snapshot["checkout_seconds_total"] / checkouts
+        return snapshot
+
+    def close(self):
+        """Close all idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._opened = False
+        for conn in idle:
+            self._discard(conn)
+
+
+# -------------------- Paged Results --------------------
+# Added to every paged row to tell identical rows apart; removed before returning
+DUP_COLUMN = "page_dup"
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _param(value):
+    """psycopg2 adapts dicts (jsonb columns) only when wrapped"""
+    return psycopg2.extras.Json(value) if isinstance(value, dict) else value
+
+
+def _order_keys(sql):
+    """
+    The top-level ORDER BY of sql as [(output column, desc, nulls_first)]:
+    [] when there is none, None when a term is not a plain output column
+    (an expression, or a column the SELECT does not return), which keyset
+    paging cannot seek on.
+    """
+    import sqlglot  # only queries read page by page (LLM SQL without LIMIT) get here
+    from sqlglot import exp
+    from sqlglot.errors import SqlglotError
+
+    try:
+        tree = sqlglot.parse_one(sql, read="postgres")
+    except SqlglotError:
+        return None
+    order = tree.args.get("order")
+    if order is None:
+        return []
+    names, keys = tree.named_selects, []
+    for term in order.expressions:
+        name = None
+        if isinstance(term.this, exp.Literal) and not term.this.is_string and "*" not in names:
+            position = int(term.this.this)
+            name = names[position - 1] if 0 < position <= len(names) else None
+        elif isinstance(term.this, exp.Column) and (term.this.name in names or "*" in names):
+            name = term.this.name
+        if name is None:
+            return None
+        keys.append((name, bool(term.args.get("desc")), bool(term.args.get("nulls_first"))))
+    return keys
+
+
+class ResultPages:
+    """
+    Rows of one query, read page by page so only one page is ever held in
+    memory, with keyset pagination: each page seeks past the sort key of
+    the previous page's last row (WHERE key > last ... LIMIT n) instead of
+    producing and discarding OFFSET rows, and rows inserted or deleted
+    between pages neither shift nor repeat later pages. The key is the
+    query's own top-level ORDER BY followed by the whole row and, for
+    rows that are otherwise identical, their number among the duplicates
+    (page_dup). Each page checks a pooled connection out for its own query only; a
+    user reading a result page by page holds no connection between pages.
+    An ORDER BY on expressions the key cannot seek on falls back to
+    LIMIT / OFFSET.
+    """
+
+    def __init__(self, pool, sql, params=None, page_size=PAGE_SIZE):
+        self.pool = pool
+        inner = sql.strip().rstrip(";")
+        self.order = _order_keys(inner)
+        if not params:
+            # The paging parameters make psycopg2 read % as a placeholder
+            inner = inner.replace("%", "%%")
+        self.inner = inner
+        self.keyed = (f"SELECT pages.*, row_number() OVER (PARTITION BY pages) AS {DUP_COLUMN} "
+                      f"FROM ({inner}) AS pages")
+        self.params = list(params or ())
+        self.page_size = page_size
+        self.total = None  # row count, known once the last page has been read
+        self._rows = None  # the whole result, when it fit in the first page
+        self._after = {0: None}  # page number → last row of the page before it
+
+    def _order_by(self):
+        terms = [f"{_quote(name)}{' DESC' if desc else ''} NULLS {'FIRST' if nulls_first else 'LAST'}"
+                 for name, desc, nulls_first in self.order]
+        return " ORDER BY " + ", ".join(terms + ["keyed"])
+
+    def _seek(self, last):
+        """WHERE clause and parameters selecting the rows sorted after last"""
+        keys = self.order + [(name, False, False) for name in last]
+        disjuncts, params = [], []
+        for i, (name, desc, nulls_first) in enumerate(keys):
+            value = last[name]
+            if value is None and not nulls_first:
+                continue  # nothing sorts after a NULL placed last
+            equal = [f"{_quote(prior)} IS NOT DISTINCT FROM %s" for prior, _, _ in keys[:i]]
+            equal_params = [_param(last[prior]) for prior, _, _ in keys[:i]]
+            if value is None:
+                step, step_params = f"{_quote(name)} IS NOT NULL", []
+            else:
+                step = f"{_quote(name)} {'<' if desc else '>'} %s"
+                step = step if nulls_first else f"({step} OR {_quote(name)} IS NULL)"
+                step_params = [_param(value)]
+            disjuncts.append("(" + " AND ".join(equal + [step]) + ")")
+            params += equal_params + step_params
+        return " WHERE " + (" OR ".join(disjuncts) or "FALSE"), params
+
+    def _query(self, number):
+        if self.order is None:
+            sql = f"SELECT * FROM ({self.inner}) AS pages ORDER BY pages LIMIT %s OFFSET %s"
+            return self.pool.run_query(sql, self.params + [self.page_size + 1, number * self.page_size])
+        # Pages are reached in order; jumping ahead walks the pages in between
+        while number not in self._after:
+            self.page(max(self._after))
+        last = self._after[number]
+        where, seek_params = self._seek(last) if last else ("", [])
+        sql = f"SELECT * FROM ({self.keyed}) AS keyed{where}{self._order_by()} LIMIT %s"
+        return self.pool.run_query(sql, self.params + seek_params + [self.page_size + 1])
+
+    def page(self, number):
+        """Rows of page number (0-based); [] past the end"""
+        if self._rows is not None:
+            return self._rows if number == 0 else []
+        if self.total is not None and number * self.page_size >= self.total:
+            return []
+        # One row beyond the page tells whether another page follows
+        rows = self._query(number)
+        more, rows = len(rows) > self.page_size, rows[:self.page_size]
+        if more:
+            self._after[number + 1] = dict(rows[-1])
+        elif rows or number == 0:
+            self.total = number * self.page_size + len(rows)
+            if number == 0:
+                self._rows = rows
+        for row in rows:
+            row.pop(DUP_COLUMN, None)
+        return rows
+
+    def has_next(self, number):
+        return self._rows is None and (self.total is None or (number + 1) * self.page_size < self.total)
+
+    @property
+    def page_count(self):
+        """Number of pages, or None while the end has not been reached"""
+        if self.total is None:
+            return None
+        return max(1, -(-self.total // self.page_size))
+
+    def close(self):
+        """Nothing is held between pages; kept for callers that close handles"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def pool_from_env():
+    """Build a pool sized by DB_POOL_MIN / DB_POOL_MAX / DB_POOL_TIMEOUT"""
+    return ConnectionPool(
+        minconn=int(os.getenv("DB_POOL_MIN", "1")),
+        maxconn=int(os.getenv("DB_POOL_MAX", "10")),
+        timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+    )
+
+
+# -------------------- Data Versioning --------------------
+# One counter per table or view in data_version. Statement-level triggers
+# bump it in the writing transaction, so the new number is visible exactly
+# when the written rows are; load_data.py and hospital_summary.py bump it
+# for table swaps and view refreshes, which fire no row triggers.
+DATA_VERSION_DDL = """
+CREATE TABLE IF NOT EXISTS data_version (
+    table_name TEXT PRIMARY KEY,
+    version BIGINT NOT NULL
+);
+CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO data_version AS v (table_name, version) VALUES (TG_ARGV[0], 1)
+    ON CONFLICT (table_name) DO UPDATE SET version = v.version + 1;
+    RETURN NULL;
+END
+$$;
+"""
+BUMP_VERSION_SQL = """
+INSERT INTO data_version AS v (table_name, version) VALUES (%s, 1)
+ON CONFLICT (table_name) DO UPDATE SET version = v.version + 1
+"""
+TABLE_VERSION_SQL = """
+SELECT string_agg(table_name || ':' || version, ',' ORDER BY table_name) AS versions
+FROM data_version
+WHERE table_name = ANY(%s)
+"""
+
+
+def create_version_table(cur):
+    """data_version and its trigger function; safe to run again"""
+    cur.execute(DATA_VERSION_DDL)
+
+
+def add_version_trigger(cur, table, name=None):
+    """
+    Bump name's (default: table's) version after every statement that
+    writes table. name lets a staging table count as the table it replaces.
+    """
+    cur.execute(f"DROP TRIGGER IF EXISTS data_version_bump ON {table}")
+    cur.execute(
+        f"CREATE TRIGGER data_version_bump AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+        f"FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('{name or table}')"
+    )
+
+
+def bump_version(cur, table):
+    cur.execute(BUMP_VERSION_SQL, (table,))
+
+
+def table_version(cur, tables):
+    """
+    Change marker for a set of tables (or materialized views): their
+    counters in data_version. A commit that writes rows, swaps in a
+    reloaded table or refreshes a view changes it in the same transaction,
+    so readers see the new version together with the new data.
+    """
+    cur.execute(TABLE_VERSION_SQL, (list(tables),))
+    row = cur.fetchone()
+    return tuple(row.values()) if isinstance(row, dict) else tuple(row)
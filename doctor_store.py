@@ -0,0 +1,294 @@
+import os
+import csv
+import re
+import sys
+import time
+import threading
+
+import areas
+
+
+FIELDNAMES = ["hospital_name", "area", "doctor_name", "specialty", "experience_years", "availability", "available_beds"]
+# Columns with few distinct values are interned so millions of rows share one string each
+INTERNED = {"hospital_name", "area", "specialty", "availability", "experience_years", "available_beds"}
+
+
+def normalize(text):
+    """Normalize hospital names for robust comparison (same rules as sam.normalize)"""
+    ignore_words = ["hospital", "center", "clinic", "medical", "super specialty"]
+    text = text.lower()
+    for w in ignore_words:
+        text = text.replace(w, "")
+    return re.sub(r'\s+', '', text)
+
+
+# -------------------- In-memory Doctor Store --------------------
+class DoctorStore:
+    """
+    Column-oriented copy of the doctor CSV with hash indexes on normalized
+    specialty, normalized hospital, availability and (specialty, available).
+    Index buckets hold row ids in file order, so lookups return rows in the
+    same order a full csv.DictReader scan would.
+
+    Availability and bed changes (updates.py) are applied in place: the
+    availability buckets are insertion-ordered dicts, so moving a row
+    between them is O(1), and bed changes are kept as one offset per
+    hospital instead of touching every doctor row. Lookups never lock;
+    they retry if an update was applied while they ran (see read()).
+
+    Alternatives are ranked by area proximity: available rows are also
+    bucketed by (specialty, area) and then hospital, so the k nearest
+    hospitals are found by walking areas.nearest() from the origin area,
+    O(areas + k) however many hospitals there are.
+    """
+
+    def __init__(self, fieldnames=None):
+        self.fieldnames = list(fieldnames or FIELDNAMES)
+        self.columns = {name: [] for name in self.fieldnames}
+        self.available = []
+        self.hospital_norm = []
+        self.area_key = []
+        self.by_specialty = {}
+        self.by_hospital = {}
+        self.by_available = {True: {}, False: {}}
+        self.by_specialty_available = {}
+        self.by_doctor = {}
+        self.by_specialty_area = {}
+        self.area_keys = {}
+        self.beds_available = {}  # hospital_norm → bed count from the latest update
+        self._hospital_norm_cache = {}
+        # Sequence counter: odd while an update is being applied
+        self._seq = 0
+        self._write_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.available)
+
+    def add(self, row):
+        """Append one CSV row (a dict of strings) and index it"""
+        row_id = len(self.available)
+        for name in self.fieldnames:
+            value = row.get(name) or ""
+            self.columns[name].append(sys.intern(value) if name in INTERNED else value)
+
+        hospital = row.get("hospital_name") or ""
+        hospital_norm = self._hospital_norm_cache.get(hospital)
+        if hospital_norm is None:
+            hospital_norm = self._hospital_norm_cache[hospital] = sys.intern(normalize(hospital))
+        area = areas.area_key(row.get("area"))
+        area = self.area_keys.setdefault(area, sys.intern(area))
+        specialty_norm = (row.get("specialty") or "").lower()
+        available = (row.get("availability") or "").strip().lower() == "true"
+
+        self.available.append(available)
+        self.hospital_norm.append(hospital_norm)
+        self.area_key.append(area)
+        self.by_specialty.setdefault(specialty_norm, []).append(row_id)
+        self.by_hospital.setdefault(hospital_norm, []).append(row_id)
+        self.by_available[available][row_id] = None
+        self.by_specialty_available.setdefault((specialty_norm, available), {})[row_id] = None
+        self.by_doctor.setdefault((hospital_norm, (row.get("doctor_name") or "").lower()), []).append(row_id)
+        if available:
+            self._bucket_area(row_id, specialty_norm)
+        return row_id
+
+    def _bucket_area(self, row_id, specialty_norm):
+        hospitals = self.by_specialty_area.setdefault((specialty_norm, self.area_key[row_id]), {})
+        hospitals.setdefault(self.hospital_norm[row_id], {})[row_id] = None
+
+    def _unbucket_area(self, row_id, specialty_norm):
+        hospitals = self.by_specialty_area[(specialty_norm, self.area_key[row_id])]
+        row_ids = hospitals[self.hospital_norm[row_id]]
+        del row_ids[row_id]
+        if not row_ids:
+            # Only hospitals with an available doctor stay in the bucket
+            del hospitals[self.hospital_norm[row_id]]
+
+    def row(self, row_id):
+        """Materialize a row as the dict csv.DictReader would have produced"""
+        row = {name: self.columns[name][row_id] for name in self.fieldnames}
+        beds = self.beds_available.get(self.hospital_norm[row_id])
+        if beds is not None and "available_beds" in row:
+            row["available_beds"] = str(beds)
+        return row
+
+    # -------------------- In-place Updates --------------------
+    def doctor_rows(self, hospital, doctor_name, specialty=None):
+        """Row ids of a doctor at a hospital (optionally only for one specialty)"""
+        row_ids = self.by_doctor.get((normalize(hospital or ""), (doctor_name or "").lower()), [])
+        if specialty:
+            specialties = self.columns["specialty"]
+            row_ids = [i for i in row_ids if specialties[i].lower() == specialty.lower()]
+        return row_ids
+
+    def _set_available(self, row_id, available):
+        if self.available[row_id] == available:
+            return
+        specialty_norm = self.columns["specialty"][row_id].lower()
+        del self.by_available[not available][row_id]
+        del self.by_specialty_available[(specialty_norm, not available)][row_id]
+        self.by_available[available][row_id] = None
+        self.by_specialty_available.setdefault((specialty_norm, available), {})[row_id] = None
+        if available:
+            self._bucket_area(row_id, specialty_norm)
+        else:
+            self._unbucket_area(row_id, specialty_norm)
+        self.available[row_id] = available
+        if "availability" in self.columns:
+            self.columns["availability"][row_id] = "True" if available else "False"
+
+    def apply(self, updates):
+        """
+        Apply a batch of updates (see updates.py for the format), each O(1)
+        for a given doctor / hospital. Returns how many matched nothing.
+        """
+        unmatched = 0
+        with self._write_lock:
+            self._seq += 1
+            try:
+                for update in updates:
+                    if update.get("kind") == "beds":
+                        hospital_norm = normalize(update.get("hospital_name") or "")
+                        if hospital_norm not in self.by_hospital:
+                            unmatched += 1
+                            continue
+                        self.beds_available[hospital_norm] = int(update["beds_available"])
+                    else:
+                        row_ids = self.doctor_rows(update.get("hospital_name"), update.get("doctor_name"),
+                                                   update.get("specialty"))
+                        if not row_ids:
+                            unmatched += 1
+                        for row_id in row_ids:
+                            self._set_available(row_id, bool(update["available"]))
+            finally:
+                self._seq += 1
+        return unmatched
+
+    def read(self, lookup, *args):
+        """
+        Run lookup(*args) without taking a lock, seqlock style: if an update
+        was applied meanwhile (or a bucket changed under the iteration) the
+        lookup simply runs again.
+        """
+        while True:
+            seq = self._seq
+            if seq % 2 == 0:
+                try:
+                    result = lookup(*args)
+                except RuntimeError:
+                    # "dictionary changed size during iteration" is only expected mid-update
+                    if self._seq == seq:
+                        raise
+                else:
+                    if self._seq == seq:
+                        return result
+            time.sleep(0)
+
+    def find_doctors(self, specialty, hospital, max_alts=2, location=None):
+        """
+        Available doctors for a specialty at the requested hospital, plus up
+        to max_alts alternatives (one per other hospital) for the same
+        specialty, nearest first to location or else the requested
+        hospital's area. With neither known they come in file order.
+        """
+        return self.read(self._find_doctors, specialty, hospital, max_alts, location)
+
+    def origin_area(self, hospital_norm=None, location=None):
+        """Area key alternatives are ranked from, or None"""
+        if location and areas.canonical_area(location):
+            return areas.area_key(areas.canonical_area(location))
+        at_hospital = self.by_hospital.get(hospital_norm)
+        if at_hospital:
+            return self.area_key[at_hospital[0]]
+        return None
+
+    def nearest_hospitals(self, specialty_norm, origin, k, exclude=None):
+        """
+        One available row per hospital for k hospitals, walking areas from
+        origin outwards; areas missing from the area model come last.
+        """
+        known = areas.nearest(origin)
+        order = list(known) + [a for a in self.area_keys if a not in areas.INDEX]
+        rows = []
+        for area in order:
+            for hospital_norm, row_ids in self.by_specialty_area.get((specialty_norm, area), {}).items():
+                if hospital_norm == exclude:
+                    continue
+                row_id = next(iter(row_ids), None)
+                if row_id is None:
+                    continue
+                rows.append(self.row(row_id))
+                if len(rows) == k:
+                    return rows
+        return rows
+
+    def _find_doctors(self, specialty, hospital, max_alts=2, location=None):
+        hospital_norm = normalize(hospital) if hospital else None
+        specialty_norm = specialty.lower() if specialty else None
+        candidates = self.by_specialty_available.get((specialty_norm, True), {})
+
+        doctors_primary = []
+        if hospital_norm:
+            # Probe whichever bucket is smaller
+            at_hospital = self.by_hospital.get(hospital_norm, [])
+            if len(at_hospital) < len(candidates):
+                specialties = self.columns["specialty"]
+                doctors_primary = [self.row(i) for i in at_hospital
+                                   if self.available[i] and specialties[i].lower() == specialty_norm]
+            else:
+                doctors_primary = [self.row(i) for i in candidates if self.hospital_norm[i] == hospital_norm]
+
+        origin = self.origin_area(hospital_norm, location)
+        if origin in areas.INDEX:
+            return doctors_primary, self.nearest_hospitals(specialty_norm, origin, max_alts, hospital_norm)
+
+        doctors_alt = []
+        seen_hospitals = set()
+        hospital_names, area_names = self.columns["hospital_name"], self.columns["area"]
+        for i in candidates:
+            if hospital_norm and self.hospital_norm[i] == hospital_norm:
+                continue
+            key = (hospital_names[i], area_names[i])
+            if key in seen_hospitals:
+                continue
+            doctors_alt.append(self.row(i))
+            seen_hospitals.add(key)
+            if len(doctors_alt) == max_alts:
+                break
+        return doctors_primary, doctors_alt
+
+
+def read_store(filepath):
+    with open(filepath, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        store = DoctorStore(reader.fieldnames)
+        for row in reader:
+            store.add(row)
+    return store
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def load_store(filepath):
+    """Return the store for filepath, building it once per file version"""
+    stat = os.stat(filepath)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _stores.get(filepath)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with _stores_lock:
+        cached = _stores.get(filepath)
+        if cached is None or cached[0] != version:
+            cached = _stores[filepath] = (version, read_store(filepath))
+    return cached[1]
+
+
+def reload_store(filepath):
+    """Rebuild filepath's store from the CSV, dropping updates applied in memory"""
+    stat = os.stat(filepath)
+    store = read_store(filepath)
+    with _stores_lock:
+        _stores[filepath] = ((stat.st_mtime_ns, stat.st_size), store)
+    return store
@@ -0,0 +1,444 @@
+import os
+import csv
+import re
+from functools import lru_cache
+
+from thefuzz import fuzz, process
+
+from db import MAX_ROWS
+
+
+# -------------------- Symptom / Specialty Vocabulary --------------------
+# Same symptom → specialty map that sam.py uses for the CSV chatbot
+specialty_map = {
+    "chest pain": "Cardiology",
+    "heart problem": "Cardiology",
+    "cardiology": "Cardiology",
+
+    "fracture": "Orthopedics",
+    "bone pain": "Orthopedics",
+    "orthopedics": "Orthopedics",
+
+    "eye problem": "Ophthalmology",
+    "vision issue": "Ophthalmology",
+    "ophthalmology": "Ophthalmology",
+
+    "stomach pain": "Gastroenterology",
+    "gastro": "Gastroenterology",
+    "gastroenterology": "Gastroenterology",
+
+    "skin rash": "Dermatology",
+    "dermatology": "Dermatology",
+
+    "pregnancy": "Gynecology",
+    "gynecology": "Gynecology",
+
+    "fever": "General Medicine",
+    "general medicine": "General Medicine",
+
+    "nervous problem": "Neurology",
+    "neurology": "Neurology",
+    "headache": "Neurology",
+    "seizure": "Neurology",
+    "memory loss": "Neurology",
+
+    "oncology": "Oncology",
+    "cancer": "Oncology",
+    "tumor": "Oncology",
+    "chemotherapy": "Oncology",
+    "radiation": "Oncology"
+}
+
+# How people name the specialist rather than the specialty
+specialist_aliases = {
+    "cardiologist": "Cardiology",
+    "heart specialist": "Cardiology",
+    "orthopedic": "Orthopedics",
+    "orthopaedic": "Orthopedics",
+    "ophthalmologist": "Ophthalmology",
+    "eye specialist": "Ophthalmology",
+    "gastroenterologist": "Gastroenterology",
+    "dermatologist": "Dermatology",
+    "skin specialist": "Dermatology",
+    "gynecologist": "Gynecology",
+    "gynaecologist": "Gynecology",
+    "general physician": "General Medicine",
+    "neurologist": "Neurology",
+    "oncologist": "Oncology",
+    "pediatrics": "Pediatrics",
+    "pediatrician": "Pediatrics",
+    "child specialist": "Pediatrics",
+    "general surgery": "General Surgery",
+    "surgeon": "General Surgery",
+}
+
+# Hospital names sam.py resolves; merged with the names found in the dataset
+hospital_list = [
+    "Coimbatore Medical Center", "Kovai Medical College Hospital", "KG Hospital",
+    "PSG Hospitals", "Sri Ramakrishna Hospital", "Ganga Hospital", "Gem Hospital",
+    "Aravind Eye Hospital", "Sugam Hospital", "Vijaya Hospital", "Medwin Specialty Hospital",
+    "Green Leaf Hospital", "Lotus Heart Center", "Sundaram Multispecialty",
+    "Royal Care Super Specialty", "Trustwell Hospital", "New Life Hospital",
+    "Wellbeing Hospital", "Hope Medical Center", "Bright Health Hospital"
+]
+
+# Words that do not identify a particular hospital on their own
+generic_hospital_words = {
+    "hospital", "hospitals", "center", "centre", "clinic", "medical", "specialty",
+    "super", "multispecialty", "health", "care", "institute", "college", "of", "sciences",
+}
+
+# Words that make a question medical even when it names no known entity
+# ("who is the best dentist"); intent_classifier never refuses those
+medical_words = {
+    "doctor", "doctors", "dr", "physician", "specialist", "surgeon", "dentist", "dental", "nurse",
+    "hospital", "hospitals", "clinic", "clinics", "medical", "bed", "beds", "icu", "ward", "emergency",
+    "ambulance", "symptom", "symptoms", "treatment", "disease", "pain", "fever", "therapy",
+}
+medical_suffixes = ("ologist", "iatrist", "iatrician", "therapist", "ologists", "iatrists", "therapists")
+
+availability_words = ["available", "availability", "currently available", "free", "open", "now"]
+unlimited_words = ["all", "every", "list"]
+capacity_words = {"bed", "beds", "capacity"}
+# Constraints the templates cannot express; questions using them go to the
+# LLM instead of getting rows that ignore the constraint. "most beds" is the
+# summary template's own ordering, so ranking words only count for doctors.
+comparison_words = {
+    "fewest", "least", "lowest", "minimum", "min", "smallest", "fewer", "less", "more",
+    "greater", "over", "under", "above", "below", "than", "between", "exceeding",
+}
+ranking_words = {"most", "best", "top", "highest", "maximum", "max", "largest", "greatest", "worst", "better"}
+negation_words = {
+    "not", "no", "without", "never", "none", "nor", "non", "cannot", "cant", "dont", "doesnt", "isnt",
+    "arent", "don", "doesn", "isn", "aren", "wasn", "unavailable", "unoccupied", "unbooked", "unlisted",
+}
+experience_words = {"experience", "experienced", "year", "years", "yrs", "senior", "junior", "veteran", "oldest", "youngest"}
+count_words = {"count", "number", "many", "much", "total"}
+conjunction_words = {"or", "and", "vs", "versus"}
+place_words = {"at", "in", "from"}
+# City names that prefix hospital names ("Coimbatore Medical Center") but on
+# their own ("neurologist in coimbatore") mean the whole city
+city_words = {"coimbatore", "kovai", "cbe"}
+
+SELECT_COLUMNS = "doctor_name, specialty, experience_years, availability, hospital_name"
+HOSPITAL_COLUMNS = "hospital_name, area, available_beds, doctor_name, specialty, availability"
+# Bed / capacity questions read the per-hospital aggregate (hospital_summary.py)
+SUMMARY_COLUMNS = "hospital_name, area, available_beds, total_doctors, available_doctors, available_by_specialty"
+
+
+# -------------------- Vocabulary Loading --------------------
+def tokenize(text):
+    text = text.lower().replace("’", "'")
+    return re.findall(r"[a-z0-9]+", text)
+
+
+@lru_cache(maxsize=8)
+def _load_vocabulary(filepath, mtime):
+    hospitals, doctors, areas = set(hospital_list), set(), set()
+    if filepath and mtime is not None:
+        with open(filepath, "r", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if row.get("hospital_name"):
+                    hospitals.add(row["hospital_name"])
+                if row.get("doctor_name"):
+                    doctors.add(row["doctor_name"])
+                if row.get("area"):
+                    areas.add(row["area"])
+
+    # Full names first, then the distinctive part ("psg" for "Psg Hospitals").
+    # A distinctive part shared by several hospitals is ambiguous and dropped.
+    hospital_phrases = {}
+    key_owners = {}
+    for name in hospitals:
+        tokens = tuple(tokenize(name))
+        hospital_phrases[tokens] = name
+        key = tuple(t for t in tokens if t not in generic_hospital_words)
+        if key and key != tokens:
+            key_owners.setdefault(key, set()).add(name.lower())
+    canonical = {name.lower(): name for name in hospitals}
+    for key, owners in key_owners.items():
+        if len(owners) == 1 and key not in hospital_phrases:
+            hospital_phrases[key] = canonical[owners.pop()]
+
+    doctor_phrases = {}
+    for name in doctors:
+        tokens = tuple(t for t in tokenize(name) if t != "dr")
+        if len(tokens) >= 2:
+            doctor_phrases[tokens] = name
+
+    specialty_phrases = {tuple(tokenize(k)): v for k, v in {**specialty_map, **specialist_aliases}.items()}
+    area_phrases = {tuple(tokenize(name)): name for name in areas if tokenize(name)}
+
+    def index_by_first_token(phrases):
+        index = {}
+        for phrase, value in sorted(phrases.items(), key=lambda item: -len(item[0])):
+            index.setdefault(phrase[0], []).append((phrase, value))
+        return index
+
+    return (index_by_first_token(hospital_phrases), index_by_first_token(doctor_phrases),
+            index_by_first_token(specialty_phrases), index_by_first_token(area_phrases))
+
+
+def load_vocabulary(filepath):
+    """Hospital, doctor, specialty and area phrases, rebuilt when the CSV changes"""
+    try:
+        mtime = os.path.getmtime(filepath) if filepath else None
+    except OSError:
+        mtime = None
+    return _load_vocabulary(filepath if mtime is not None else None, mtime)
+
+
+# -------------------- Intent Detection --------------------
+def _matches(tokens, index):
+    """Yield (position, phrase, value) for every phrase found in tokens, longest first per position"""
+    for i, token in enumerate(tokens):
+        for phrase, value in index.get(token, ()):
+            if tuple(tokens[i:i + len(phrase)]) == phrase:
+                yield i, phrase, value
+
+
+def _find_hospital(tokens, index):
+    best = None
+    for i, phrase, name in _matches(tokens, index):
+        # A one-word nickname ("hope", "gem") only counts when used as a place,
+        # a city name only when followed by "hospital" / "medical" ...
+        if len(phrase) == 1:
+            before = tokens[i - 1] if i > 0 else ""
+            after = tokens[i + 1] if i + 1 < len(tokens) else ""
+            if after not in generic_hospital_words and (before not in place_words or phrase[0] in city_words):
+                continue
+        if best is None or len(phrase) > len(best[0]):
+            best = (phrase, name)
+    return best[1] if best else None
+
+
+def _find_phrase(tokens, index):
+    best = (None, None)
+    for _, phrase, value in _matches(tokens, index):
+        if best[0] is None or len(phrase) > len(best[0]):
+            best = (phrase, value)
+    return best
+
+
+def _names_unknown_hospital(tokens, hospital):
+    """True for "at / in <something> hospital" when no known hospital was found"""
+    if hospital:
+        return False
+    for i, token in enumerate(tokens):
+        if token in place_words and any(t in generic_hospital_words for t in tokens[i + 2:i + 5]):
+            return True
+    return False
+
+
+def extract_slots(clean_query, filepath=None):
+    """
+    Entities mentioned in the question: doctor, hospital, area, specialty
+    (and the phrase that named it), plus the available / unlimited /
+    capacity flags, how many distinct entities are named and whether an
+    unknown hospital is. Shared by detect_intent and intent_classifier.
+    """
+    # "neurologists" / "pediatricians" / "surgeons" → singular specialist words
+    tokens = [t[:-1] if t.endswith(("ists", "ians", "eons")) else t for t in tokenize(clean_query)]
+    vocabulary = load_vocabulary(filepath)
+    hospital_phrases, doctor_phrases, specialty_phrases, area_phrases = vocabulary
+
+    specialty_phrase, specialty = _find_phrase(tokens, specialty_phrases)
+    hospital = _find_hospital(tokens, hospital_phrases)
+    entities = {(kind, value) for kind, index in enumerate(vocabulary) for _, _, value in _matches(tokens, index)}
+    return {
+        "tokens": tokens,
+        "doctor": _find_phrase(tokens, doctor_phrases)[1],
+        "hospital": hospital,
+        "area": _find_phrase(tokens, area_phrases)[1],
+        "specialty": specialty,
+        "specialty_phrase": " ".join(specialty_phrase) if specialty_phrase else None,
+        "available": any(word in clean_query for word in availability_words),
+        "unlimited": any(word in tokens for word in unlimited_words),
+        "capacity": any(t in capacity_words for t in tokens),
+        "entities": len(entities),
+        "unknown_hospital": _names_unknown_hospital(tokens, hospital),
+    }
+
+
+def mentions_medical(slots):
+    """True when the question names a known entity or uses a medical word"""
+    if slots["doctor"] or slots["hospital"] or slots["specialty"] or slots["capacity"]:
+        return True
+    return any(t in medical_words or t.endswith(medical_suffixes) for t in slots["tokens"])
+
+
+def needs_model(slots):
+    """
+    True when the question carries a constraint the templates would drop:
+    a number, negation, two entities joined by or / and, a hospital that is
+    not in the vocabulary, or (except for bed questions, which only order
+    by beds) ranking, experience and counting words.
+    """
+    tokens = slots["tokens"]
+    if slots["unknown_hospital"] or any(t.isdigit() or t in negation_words for t in tokens):
+        return True
+    if slots["entities"] > 1 and any(t in conjunction_words for t in tokens):
+        return True
+    if slots["capacity"] and not slots["doctor"] and not slots["specialty"]:
+        return any(t in comparison_words for t in tokens)
+    return any(t in comparison_words or t in ranking_words or t in experience_words or t in count_words
+               for t in tokens)
+
+
+def detect_intent(clean_query, filepath=None, slots=None):
+    """
+    Recognize the three question shapes from SYSTEM_PROMPT without the LLM.
+    Returns a dict with intent, query_type, doctor, hospital, area,
+    specialty, available, unlimited and capacity keys, or None when the
+    question needs the model (see needs_model). Bed / capacity questions
+    are hospital questions even without a hospital name.
+    """
+    slots = slots or extract_slots(clean_query, filepath)
+    if needs_model(slots):
+        return None
+    specialty = slots["specialty"]
+
+    if slots["doctor"]:
+        intent = query_type = "doctor"
+    elif specialty:
+        intent = "symptom"
+        # "cardiologist" asks for a doctor, "chest pain" describes a symptom
+        phrase = slots["specialty_phrase"]
+        is_symptom = phrase in specialty_map and phrase != specialty.lower()
+        query_type = "symptom" if is_symptom else "doctor"
+    elif slots["capacity"]:
+        intent = query_type = "hospital"
+    elif slots["hospital"]:
+        intent = query_type = "hospital"
+    else:
+        return None
+
+    return {
+        "intent": intent,
+        "query_type": query_type,
+        "doctor": slots["doctor"],
+        "hospital": slots["hospital"],
+        "area": slots["area"],
+        "specialty": specialty,
+        "available": slots["available"],
+        "unlimited": slots["unlimited"],
+        "capacity": slots["capacity"],
+    }
+
+
+def _fuzzy_phrase(tokens, phrases, cutoff):
+    """
+    Best phrase whose every distinctive word is close (fuzz.ratio >= cutoff)
+    to some word of the question, or None. Matching word by word keeps a
+    shared generic word ("hospitals") from matching a whole sentence.
+    """
+    best, best_score = None, cutoff - 1
+    for phrase in phrases:
+        words = [w for w in tokenize(phrase) if w not in generic_hospital_words]
+        if not words:
+            continue
+        score = min(process.extractOne(w, tokens, scorer=fuzz.ratio)[1] for w in words)
+        if score > best_score:
+            best, best_score = phrase, score
+    return best
+
+
+def fuzzy_intent(clean_query, filepath=None, slots=None, cutoff=80):
+    """
+    Looser, sam.py-style resolution for questions detect_intent could not
+    place (typos): the symptom from specialty_map or hospital from
+    hospital_list whose words each fuzzily match a word of the question.
+    Returns the same dict as detect_intent, or None. Used as the local
+    answer hedged against the LLM.
+    """
+    slots = slots or extract_slots(clean_query, filepath)
+    tokens = slots["tokens"]
+    if not tokens or needs_model(slots):
+        return None
+    symptom = _fuzzy_phrase(tokens, specialty_map, cutoff)
+    hospital = slots["hospital"] or _fuzzy_phrase(tokens, hospital_list, cutoff)
+
+    if symptom:
+        intent = query_type = "symptom"
+        specialty = specialty_map[symptom]
+    elif hospital:
+        intent = query_type = "hospital"
+        specialty = None
+    else:
+        return None
+
+    return {
+        "intent": intent,
+        "query_type": query_type,
+        "doctor": None,
+        "hospital": hospital,
+        "area": slots["area"],
+        "specialty": specialty,
+        "available": slots["available"],
+        "unlimited": False,
+        "capacity": slots["capacity"],
+    }
+
+
+# -------------------- SQL Templates --------------------
+def build_sql(intent, paginate=False):
+    """
+    Turn a detected intent into (sql, params) for psycopg2. Text filters
+    compare lower(column) so the expression indexes apply. "All doctors"
+    questions are capped at MAX_ROWS unless the caller pages through them.
+    """
+    if intent["intent"] == "hospital" and intent.get("capacity"):
+        return build_hospital_sql(intent, paginate)
+
+    conditions, params = [], []
+    if intent["doctor"]:
+        conditions.append("LOWER(doctor_name) = %s")
+        params.append(intent["doctor"].lower())
+    if intent["specialty"] and not intent["doctor"]:
+        conditions.append("LOWER(specialty) = %s")
+        params.append(intent["specialty"].lower())
+    if intent["hospital"]:
+        conditions.append("LOWER(hospital_name) = %s")
+        params.append(intent["hospital"].lower())
+    if intent["area"]:
+        conditions.append("LOWER(area) = %s")
+        params.append(intent["area"].lower())
+    if intent["available"]:
+        conditions.append("availability = TRUE")
+
+    columns = HOSPITAL_COLUMNS if intent["intent"] == "hospital" else SELECT_COLUMNS
+    sql = f"SELECT {columns} FROM hospital_doctor_data WHERE " + " AND ".join(conditions)
+    return sql + _limit(intent, paginate) + ";", params
+
+
+def build_hospital_sql(intent, paginate=False):
+    """Bed / capacity questions: one row per hospital from hospital_summary, most beds first"""
+    conditions, params = [], []
+    if intent["hospital"]:
+        conditions.append("LOWER(hospital_name) = %s")
+        params.append(intent["hospital"].lower())
+    if intent["area"]:
+        conditions.append("LOWER(area) = %s")
+        params.append(intent["area"].lower())
+    if intent["available"] and not intent["hospital"]:
+        # "hospitals with free beds" is about beds, not doctors; a named
+        # hospital's row already answers with its bed count, even zero
+        conditions.append("available_beds > 0")
+
+    sql = f"SELECT {SUMMARY_COLUMNS} FROM hospital_summary"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY available_beds DESC"
+    return sql + _limit(intent, paginate) + ";", params
+
+
+def _limit(intent, paginate):
+    if not intent["unlimited"]:
+        return " LIMIT 3"
+    return "" if paginate else f" LIMIT {MAX_ROWS}"
+
+
+def render_sql(sql, params):
+    """Inline the parameters for display only; execution keeps them bound"""
+    quoted = ["'" + str(p).replace("'", "''") + "'" for p in params]
+    return sql.replace("%s", "{}").format(*quoted)
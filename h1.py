@@ -5,6 +5,8 @@ import re
 from dotenv import load_dotenv
 from groq import Groq
 from thefuzz import process
+from llm_cache import get_cache
+import prompts
 import psycopg2.extras
 import re
 # -------------------- Load Environment Variables --------------------
@@ -12,6 +14,7 @@ load_dotenv()
 
 # Initialize Groq client
 client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+LLAMA_MODEL = "llama-3.1-8b-instant"
 
 # Connect to PostgreSQL
 conn = psycopg2.connect(
@@ -25,59 +28,7 @@ cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
 
 # -------------------- Prompt Template --------------------
-SYSTEM_PROMPT = """
-You are a hospital-doctor information assistant.  
-Your job is to convert user questions into SQL queries, execute them, 
-and then return a polite natural-language answer.
-
-You must follow these rules strictly:
-
-1. Input: User will ask about hospitals, doctors, symptoms, specialties, beds, or availability.
-2. Output: You MUST return ONLY a valid SQL query (no explanations, no natural text).
-3. Always query using ONLY these tables:
-   - hospital_doctor_data(hospital_name, area, doctor_name, specialty, experience_years, availability, available_beds)
-   - symptom_specialty(symptom_keyword, specialty)
-4. DO NOT make any typo or change in table or column names. Use the table names exactly:
-   hospital_doctor_data, symptom_specialty
-5. If input is unclear, make the best SQL guess.
-6. Always limit results to MAX 3 rows.
-7. If the user query implies available doctors (words like "available", "free", "now"), always add "AND availability = TRUE" in your SQL WHERE clause.
-8. When filtering text columns such as 'specialty', perform case-insensitive comparisons using ILIKE in PostgreSQL, (e.g.):
-SELECT ... FROM hospital_doctor_data WHERE specialty ILIKE '<specialty>' LIMIT 3;
-
---------------------
-DATABASE SCHEMA
---------------------
-Table: hospital_doctor_data
-    - hospital_name TEXT
-    - area TEXT
-    - doctor_name TEXT
-    - specialty TEXT
-    - experience_years INT
-    - availability TEXT
-    - available_beds INT
-
-Table: symptom_specialty
-    - symptom_keyword TEXT
-    - specialty TEXT
-
---------------------
-TASK
---------------------
-1. Understand user query and map it to SQL using ONLY the above tables.  
-2. Output ONLY the SQL query.  
-3. Use SELECT statements fetching relevant columns.  
-4. Examples:
-
-Example (Doctor query):  
-SELECT doctor_name, specialty, experience_years, availability, hospital_name FROM hospital_doctor_data WHERE doctor_name = '<doctor_name>' LIMIT 3;
-
-Example (Hospital query):  
-SELECT doctor_name, specialty, experience_years, availability, hospital_name FROM hospital_doctor_data WHERE hospital_name = '<hospital_name>' LIMIT 3;
-
-Example (Symptom query):  
-SELECT doctor_name, specialty, experience_years, availability, hospital_name FROM hospital_doctor_data WHERE specialty IN (SELECT specialty FROM symptom_specialty WHERE symptom_keyword = '<symptom>') LIMIT 3;
-"""
+SYSTEM_PROMPT = prompts.SYSTEM_PROMPT  # single copy, shared with chatbot.py
 
 
 def normalize_input(user_query: str) -> str:
@@ -89,16 +40,19 @@ def normalize_input(user_query: str) -> str:
 
 
 def ask_llama(user_query: str) -> str:
-    """Send user query to Groq (LLaMA) and return response"""
-    response = client.chat.completions.create(
-        model="llama-3.1-8b-instant",
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": user_query}
-        ],
-        temperature=0  # deterministic SQL
-    )
-    return response.choices[0].message.content.strip()
+    """Send user query to Groq (LLaMA) and return response (cached, since temperature=0 is deterministic)"""
+    def call():
+        response = client.chat.completions.create(
+            model=LLAMA_MODEL,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": user_query}
+            ],
+            temperature=0  # deterministic SQL
+        )
+        return response.choices[0].message.content.strip()
+
+    return get_cache().get_or_call(LLAMA_MODEL, SYSTEM_PROMPT, user_query, call)
 
 
 def fuzzy_match(user_input, column_values):
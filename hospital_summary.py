@@ -0,0 +1,109 @@
+import time
+import argparse
+
+import psycopg2
+from dotenv import load_dotenv
+
+from db import bump_version, connect_kwargs, create_version_table, table_version
+
+
+# -------------------- Hospital-level Aggregate --------------------
+# One row per hospital, so bed / capacity questions do not scan and
+# de-duplicate doctor rows. available_beds is repeated on every doctor row
+# of hospital_doctor_data (and not always with the same value); the largest
+# one is kept.
+SUMMARY_SQL = """
+CREATE MATERIALIZED VIEW hospital_summary AS
+WITH per_specialty AS (
+    SELECT hospital_name, area, specialty,
+           count(*) AS doctors,
+           count(*) FILTER (WHERE availability) AS available,
+           max(available_beds) AS beds
+    FROM hospital_doctor_data
+    GROUP BY hospital_name, area, specialty
+)
+SELECT hospital_name, area,
+       max(beds) AS available_beds,
+       sum(doctors)::int AS total_doctors,
+       sum(available)::int AS available_doctors,
+       jsonb_object_agg(specialty, available) AS available_by_specialty
+FROM per_specialty
+GROUP BY hospital_name, area
+"""
+
+# The unique index is what REFRESH ... CONCURRENTLY needs; the others make
+# the fast_path.build_sql shapes (by hospital, by area ordered by beds) one
+# index lookup each.
+SUMMARY_INDEXES = [
+    "CREATE UNIQUE INDEX hospital_summary_key ON hospital_summary (hospital_name, area)",
+    "CREATE INDEX hospital_summary_name_idx ON hospital_summary (lower(hospital_name))",
+    "CREATE INDEX hospital_summary_area_beds_idx ON hospital_summary (lower(area), available_beds DESC)",
+    "CREATE INDEX hospital_summary_beds_idx ON hospital_summary (available_beds DESC)",
+]
+
+
+def drop_summary(cur):
+    cur.execute("DROP MATERIALIZED VIEW IF EXISTS hospital_summary")
+
+
+def create_summary(cur):
+    """(Re)build the view and its indexes; runs inside the caller's transaction"""
+    drop_summary(cur)
+    cur.execute(SUMMARY_SQL)
+    for statement in SUMMARY_INDEXES:
+        cur.execute(statement)
+    cur.execute("ANALYZE hospital_summary")
+    create_version_table(cur)
+    bump_version(cur, "hospital_summary")
+
+
+def refresh_summary(conn, concurrently=True):
+    """
+    Recompute the aggregate. CONCURRENTLY keeps it readable during the
+    refresh (it relies on the unique index). A view fires no triggers, so
+    its data_version is bumped here, after the refresh: a reader that
+    still sees the old number may cache new rows under it, never old rows
+    under the new one.
+    """
+    with conn.cursor() as cur:
+        cur.execute(f"REFRESH MATERIALIZED VIEW {'CONCURRENTLY ' if concurrently else ''}hospital_summary")
+        bump_version(cur, "hospital_summary")
+
+
+def refresh_when_changed(conn, interval, concurrently=True):
+    """Refresh every interval seconds, but only after hospital_doctor_data changed"""
+    last_version = None
+    while True:
+        with conn.cursor() as cur:
+            version = table_version(cur, ["hospital_doctor_data"])
+        if version != last_version:
+            started = time.perf_counter()
+            refresh_summary(conn, concurrently=concurrently)
+            print(f"✅ hospital_summary refreshed in {time.perf_counter() - started:.2f}s")
+            last_version = version
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or refresh the hospital_summary materialized view.")
+    parser.add_argument("--create", action="store_true", help="(re)create the view and its indexes")
+    parser.add_argument("--every", type=float, help="keep running, refreshing this often (seconds) when data changed")
+    args = parser.parse_args()
+
+    load_dotenv()
+    conn = psycopg2.connect(**connect_kwargs())
+    try:
+        if args.create:
+            with conn.cursor() as cur:
+                create_summary(cur)
+            conn.commit()
+            print("✅ hospital_summary created")
+        else:
+            conn.autocommit = True
+            if args.every:
+                refresh_when_changed(conn, args.every)
+            else:
+                refresh_summary(conn)
+                print("✅ hospital_summary refreshed")
+    finally:
+        conn.close()
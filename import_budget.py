@@ -0,0 +1,76 @@
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+
+
+# Imported in a fresh interpreter with sockets disabled: a module that opens
+# a connection (Postgres, Groq, metrics server) while importing fails here.
+PROBE = """
+import socket, sys, time
+def refuse(*args, **kwargs):
+    raise RuntimeError("network I/O during import")
+socket.socket.connect = refuse
+socket.create_connection = refuse
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+import {module}
+print("IMPORT_SECONDS", time.perf_counter() - started)
+"""
+_IMPORTTIME = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module, runs=3):
+    """
+    Cold import time of module (best of runs, seconds) and the slowest
+    direct dependencies in the last run as (cumulative seconds, name).
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, GROQ_API_KEY=os.getenv("GROQ_API_KEY", "import-budget"), PYTHONDONTWRITEBYTECODE="1")
+    best, slowest = None, []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", PROBE.format(root=root, module=module)],
+            capture_output=True, text=True, env=env, cwd=root,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"importing {module} failed:\n{result.stderr[-2000:]}")
+        seconds = float(re.search(r"IMPORT_SECONDS ([\d.e-]+)", result.stdout).group(1))
+        best = seconds if best is None else min(best, seconds)
+
+        # One level below the top: what the measured module itself pulls in
+        children = []
+        for line in result.stderr.splitlines():
+            match = _IMPORTTIME.match(line)
+            if match and len(match.group(3)) == 3:
+                children.append((int(match.group(2)) / 1e6, match.group(4)))
+        slowest = sorted(children, reverse=True)[:10]
+    return best, slowest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail if a module's cold import exceeds its time budget.")
+    parser.add_argument("modules", nargs="*", default=["app"], help="modules to import (default: app)")
+    parser.add_argument("--budget", type=float, default=float(os.getenv("IMPORT_BUDGET_SECONDS", "2.0")),
+                        help="seconds allowed per module (IMPORT_BUDGET_SECONDS)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    results, over = {}, []
+    for module in args.modules:
+        seconds, slowest = measure(module, args.runs)
+        results[module] = {"seconds": seconds, "slowest": slowest}
+        if seconds > args.budget:
+            over.append(module)
+        if not args.json:
+            status = "❌" if seconds > args.budget else "✅"
+            print(f"{status} import {module}: {seconds:.3f}s (budget {args.budget:.3f}s)")
+            for cumulative, name in slowest:
+                print(f"   {cumulative:8.3f}s  {name}")
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    sys.exit(1 if over else 0)
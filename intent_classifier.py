@@ -0,0 +1,168 @@
+import os
+import json
+import math
+import time
+import argparse
+from collections import Counter
+from functools import lru_cache
+
+from fast_path import extract_slots, mentions_medical
+
+
+LABELS = ("doctor", "hospital", "symptom", "out_of_scope")
+TRAINING_PATH = os.getenv("INTENT_TRAINING_PATH",
+                          os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_training.jsonl"))
+# Below this probability an out_of_scope prediction still goes to the LLM
+OUT_OF_SCOPE_CONFIDENCE = float(os.getenv("INTENT_OUT_OF_SCOPE_CONFIDENCE", "0.8"))
+
+
+# -------------------- Features --------------------
+def features(slots):
+    """Unigrams, bigrams and one feature per entity found by the fast path vocabulary"""
+    tokens = slots["tokens"]
+    feats = list(tokens)
+    feats.extend(f"{a}_{b}" for a, b in zip(tokens, tokens[1:]))
+    for slot in ("doctor", "hospital", "area", "specialty", "capacity", "available"):
+        if slots[slot]:
+            feats.append(f"<{slot}>")
+    if slots["specialty_phrase"] and slots["specialty"] and slots["specialty_phrase"] != slots["specialty"].lower():
+        feats.append("<specialty_phrase>")
+    return feats
+
+
+# -------------------- Multinomial Naive Bayes --------------------
+class IntentClassifier:
+    """Multinomial naive Bayes with Laplace smoothing; a prediction is a few dict lookups"""
+
+    def __init__(self, examples, alpha=1.0):
+        class_counts = Counter()
+        feature_counts = {label: Counter() for label in LABELS}
+        for feats, label in examples:
+            class_counts[label] += 1
+            feature_counts[label].update(feats)
+
+        total = sum(class_counts.values()) or 1
+        vocabulary = set().union(*feature_counts.values())
+        self.log_priors = [math.log((class_counts[label] + alpha) / (total + alpha * len(LABELS))) for label in LABELS]
+        denominators = [sum(feature_counts[label].values()) + alpha * (len(vocabulary) + 1) for label in LABELS]
+        # feature → per-label log likelihood; unseen features are skipped at prediction time
+        self.log_likelihoods = {
+            feat: tuple(math.log((feature_counts[label][feat] + alpha) / denom)
+                        for label, denom in zip(LABELS, denominators))
+            for feat in vocabulary
+        }
+
+    def predict_features(self, feats):
+        scores = list(self.log_priors)
+        for feat in feats:
+            likelihoods = self.log_likelihoods.get(feat)
+            if likelihoods:
+                for i, value in enumerate(likelihoods):
+                    scores[i] += value
+        best = max(scores)
+        weights = [math.exp(score - best) for score in scores]
+        total = sum(weights)
+        probabilities = {label: weight / total for label, weight in zip(LABELS, weights)}
+        label = max(probabilities, key=probabilities.get)
+        return label, probabilities[label]
+
+
+def read_examples(path, filepath=None):
+    examples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                slots = extract_slots(record["query"].lower(), filepath)
+                examples.append((features(slots), record["intent"]))
+    return examples
+
+
+@lru_cache(maxsize=4)
+def _load_model(path, mtime, filepath):
+    return IntentClassifier(read_examples(path, filepath))
+
+
+def load_model(path=TRAINING_PATH, filepath=None):
+    """Trained on first use and retrained when the labeled file changes"""
+    return _load_model(path, os.path.getmtime(path), filepath)
+
+
+def classify(clean_query, filepath=None, slots=None):
+    """
+    Predict doctor / hospital / symptom / out_of_scope for a normalized
+    question. Returns {"intent", "confidence", "slots"}; slots are the
+    fast path entities (doctor, hospital, area, specialty, flags).
+    """
+    slots = slots or extract_slots(clean_query, filepath)
+    label, confidence = load_model(filepath=filepath).predict_features(features(slots))
+    return {"intent": label, "confidence": confidence, "slots": slots}
+
+
+def is_out_of_scope(prediction):
+    """Confidently off-topic and without any medical word; those always reach the LLM"""
+    return (prediction["intent"] == "out_of_scope" and prediction["confidence"] >= OUT_OF_SCOPE_CONFIDENCE
+            and not mentions_medical(prediction["slots"]))
+
+
+# -------------------- Evaluation --------------------
+# In-scope phrasings kept out of the training file; none may be refused
+IN_SCOPE_HELD_OUT = [
+    "who is the best dentist",
+    "top ent doctor near me",
+    "best eye hospital in coimbatore",
+    "which psychiatrist is good",
+    "i need a physiotherapist",
+    "most experienced heart surgeon",
+    "best doctor for diabetes",
+    "top rated skin specialist",
+    "any clinic open now",
+    "is there an icu bed free",
+]
+
+
+def cross_validate(examples, folds=5):
+    """k-fold accuracy and the confusion counts (true, predicted)"""
+    correct, confusion = 0, Counter()
+    for fold in range(folds):
+        train = [e for i, e in enumerate(examples) if i % folds != fold]
+        test = [e for i, e in enumerate(examples) if i % folds == fold]
+        model = IntentClassifier(train)
+        for feats, label in test:
+            predicted, _ = model.predict_features(feats)
+            correct += predicted == label
+            confusion[(label, predicted)] += 1
+    return correct / len(examples), confusion
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate the intent classifier on its labeled file.")
+    parser.add_argument("--training", default=TRAINING_PATH)
+    parser.add_argument("--dataset", default="hospital_dataset.csv", help="CSV the entity vocabulary comes from")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("queries", nargs="*", help="questions to classify")
+    args = parser.parse_args()
+
+    examples = read_examples(args.training, args.dataset)
+    accuracy, confusion = cross_validate(examples, args.folds)
+    print(f"📊 {len(examples)} examples, {args.folds}-fold accuracy {accuracy:.1%}")
+    for (label, predicted), count in sorted(confusion.items()):
+        if label != predicted:
+            print(f"   {label:<12} → {predicted:<12} {count}")
+
+    refused = [query for query in IN_SCOPE_HELD_OUT if is_out_of_scope(classify(query, args.dataset))]
+    print(f"🩺 {len(IN_SCOPE_HELD_OUT) - len(refused)}/{len(IN_SCOPE_HELD_OUT)} held-out in-scope questions answered")
+    for query in refused:
+        print(f"   refused {query!r}")
+
+    model = IntentClassifier(examples)
+    feats = [features(extract_slots(query, args.dataset)) for query in ("i have chest pain", "tell me a joke")]
+    runs = 10000
+    started = time.perf_counter()
+    for i in range(runs):
+        model.predict_features(feats[i % 2])
+    print(f"⏱️ {(time.perf_counter() - started) / runs * 1e6:.1f}us per prediction (features precomputed)")
+
+    for query in args.queries:
+        prediction = classify(query.lower(), args.dataset)
+        print(f"🩺 {query!r}: {prediction['intent']} ({prediction['confidence']:.2f})")
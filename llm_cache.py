@@ -0,0 +1,155 @@
+import os
+import time
+import json
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+# -------------------- Key Helpers --------------------
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def cache_key(model: str, prompt: str, query: str) -> str:
+    """Key on model + system prompt + normalized user query"""
+    raw = json.dumps([model, prompt_hash(prompt), query], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# -------------------- Two-tier LLM Cache --------------------
+class LLMCache:
+    """
+    In-process LRU with TTL, backed by an SQLite file that survives restarts.
+    Entries are keyed on (model, prompt, query), so editing SYSTEM_PROMPT
+    never serves SQL generated by the old prompt; use invalidate() to drop
+    the stale rows from disk as well.
+    """
+
+    def __init__(self, path=".llm_cache.sqlite3", max_entries=1024, ttl=7 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "expired": 0, "writes": 0}
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, model TEXT, prompt_hash TEXT,"
+                " response TEXT, created_at REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_prompt ON llm_cache(prompt_hash)")
+            self._db.commit()
+
+    def _expired(self, created_at, now):
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def _remember(self, key, response, created_at):
+        self._memory[key] = (response, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get(self, model, prompt, query):
+        """Return the cached response or None"""
+        key = cache_key(model, prompt, query)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[1], now):
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return entry[0]
+                del self._memory[key]
+                self._stats["expired"] += 1
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if not self._expired(row[1], now):
+                        self._remember(key, row[0], row[1])
+                        self._stats["disk_hits"] += 1
+                        return row[0]
+                    self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._db.commit()
+                    self._stats["expired"] += 1
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, model, prompt, query, response):
+        key = cache_key(model, prompt, query)
+        now = time.time()
+        with self._lock:
+            self._remember(key, response, now)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?)",
+                    (key, model, prompt_hash(prompt), response, now),
+                )
+                self._db.commit()
+            self._stats["writes"] += 1
+
+    def get_or_call(self, model, prompt, query, call):
+        """Return the cached response, or call() and cache its result"""
+        response = self.get(model, prompt, query)
+        if response is None:
+            response = call()
+            self.set(model, prompt, query, response)
+        return response
+
+    def invalidate(self, prompt=None, model=None):
+        """
+        Drop cached entries for a prompt and/or model (everything if neither
+        is given). Call with the old SYSTEM_PROMPT after changing it.
+        """
+        clauses, params = [], []
+        if prompt is not None:
+            clauses.append("prompt_hash = ?")
+            params.append(prompt_hash(prompt))
+        if model is not None:
+            clauses.append("model = ?")
+            params.append(model)
+        with self._lock:
+            # memory keys are opaque hashes, so rebuild the LRU from scratch
+            self._memory.clear()
+            if self._db is None:
+                return 0
+            where = " WHERE " + " AND ".join(clauses) if clauses else ""
+            removed = self._db.execute(f"DELETE FROM llm_cache{where}", params).rowcount
+            self._db.commit()
+            return removed
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["memory_entries"] = len(self._memory)
+        lookups = snapshot["memory_hits"] + snapshot["disk_hits"] + snapshot["misses"]
+        snapshot["hit_ratio"] = (snapshot["memory_hits"] + snapshot["disk_hits"]) / lookups if lookups else 0.0
+        return snapshot
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_cache():
+    """Process-wide cache configured by LLM_CACHE_PATH / LLM_CACHE_SIZE / LLM_CACHE_TTL"""
+    global _default_cache
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                _default_cache = LLMCache(
+                    path=os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite3") or None,
+                    max_entries=int(os.getenv("LLM_CACHE_SIZE", "1024")),
+                    ttl=float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600))),
+                )
+    return _default_cache
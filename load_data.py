@@ -0,0 +1,156 @@
+import io
+import csv
+import gzip
+import time
+import argparse
+
+import psycopg2
+from dotenv import load_dotenv
+
+from db import add_version_trigger, bump_version, connect_kwargs, create_version_table
+from doctor_store import FIELDNAMES
+from fast_path import specialty_map
+from hospital_summary import create_summary, drop_summary
+
+
+# -------------------- Table Definitions --------------------
+DOCTOR_COLUMNS = """
+    hospital_name TEXT,
+    area TEXT,
+    doctor_name TEXT,
+    specialty TEXT,
+    experience_years INT,
+    availability BOOLEAN,
+    available_beds INT
+"""
+SYMPTOM_COLUMNS = """
+    symptom_keyword TEXT,
+    specialty TEXT
+"""
+
+# (index suffix, definition) for the query shapes chatbot.py / fast_path.py
+# produce: LOWER(col) = 'x' or LIKE 'x%', plus the availability filter.
+# text_pattern_ops serves both equality and prefix LIKE.
+DOCTOR_INDEXES = [
+    ("specialty_idx", "(lower(specialty) text_pattern_ops, availability)"),
+    ("hospital_name_idx", "(lower(hospital_name) text_pattern_ops, availability)"),
+    ("doctor_name_idx", "(lower(doctor_name) text_pattern_ops)"),
+    ("available_idx", "(availability) WHERE availability"),
+]
+SYMPTOM_INDEXES = [
+    ("symptom_keyword_idx", "(lower(symptom_keyword) text_pattern_ops)"),
+]
+
+
+# -------------------- Staging Load and Swap --------------------
+def load_table(conn, table, columns, indexes, source, column_names, before_swap=None, after_swap=None):
+    """
+    COPY source into <table>_staging, index it, then swap it in for table in
+    one transaction. Readers see either the old or the new table, and a
+    failed run leaves the live table untouched, so reruns are safe.
+    before_swap / after_swap(cur) run inside that transaction, e.g. to drop
+    and rebuild views that depend on table. The swap bumps table's
+    data_version, and the new table carries the trigger that bumps it on
+    later writes. Returns (row count, per-phase timings).
+    """
+    staging = f"{table}_staging"
+    timings = {}
+    with conn.cursor() as cur:
+        started = time.perf_counter()
+        cur.execute(f"DROP TABLE IF EXISTS {staging}")
+        cur.execute(f"CREATE TABLE {staging} ({columns})")
+        cur.copy_expert(
+            f"COPY {staging} ({', '.join(column_names)}) FROM STDIN WITH (FORMAT csv, HEADER true)",
+            source,
+            size=1 << 20,
+        )
+        rows = cur.rowcount
+        timings["copy"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for suffix, definition in indexes:
+            cur.execute(f"CREATE INDEX {staging}_{suffix} ON {staging} {definition}")
+        create_version_table(cur)
+        add_version_trigger(cur, staging, table)
+        timings["index"] = time.perf_counter() - started
+
+        # Planner statistics are in place before the first query hits the new table
+        started = time.perf_counter()
+        cur.execute(f"ANALYZE {staging}")
+        timings["analyze"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        if before_swap:
+            before_swap(cur)
+        cur.execute(f"DROP TABLE IF EXISTS {table}")
+        cur.execute(f"ALTER TABLE {staging} RENAME TO {table}")
+        for suffix, _ in indexes:
+            cur.execute(f"ALTER INDEX {staging}_{suffix} RENAME TO {table}_{suffix}")
+        bump_version(cur, table)
+        if after_swap:
+            after_swap(cur)
+        conn.commit()
+        timings["swap"] = time.perf_counter() - started
+    return rows, timings
+
+
+def open_csv(filepath):
+    """Text stream for a doctor CSV, gunzipped on the fly for .gz (synthetic.py output)"""
+    if filepath.endswith(".gz"):
+        return gzip.open(filepath, "rt", encoding="utf-8", newline="")
+    return open(filepath, "r", encoding="utf-8", newline="")
+
+
+def read_header(filepath):
+    with open_csv(filepath) as f:
+        header = next(csv.reader(f), [])
+    header = [name.strip() for name in header]
+    if sorted(header) != sorted(FIELDNAMES):
+        raise ValueError(f"{filepath}: expected columns {FIELDNAMES}, found {header}")
+    return header
+
+
+def load_doctors(conn, filepath):
+    column_names = read_header(filepath)
+    with open_csv(filepath) as f:
+        # hospital_summary is rebuilt from the new rows in the same transaction
+        return load_table(conn, "hospital_doctor_data", DOCTOR_COLUMNS, DOCTOR_INDEXES, f, column_names,
+                          before_swap=drop_summary, after_swap=create_summary)
+
+
+def load_symptoms(conn):
+    """symptom_specialty from the same symptom → specialty map as the fast path"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["symptom_keyword", "specialty"])
+    writer.writerows(specialty_map.items())
+    buffer.seek(0)
+    return load_table(conn, "symptom_specialty", SYMPTOM_COLUMNS, SYMPTOM_INDEXES, buffer,
+                      ["symptom_keyword", "specialty"])
+
+
+def report(table, rows, timings):
+    total = sum(timings.values())
+    phases = " | ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items())
+    rate = rows / timings["copy"] if timings["copy"] else 0.0
+    print(f"✅ {table}: {rows} rows in {total:.2f}s ({rate:,.0f} rows/s copied) — {phases}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk load the chatbot tables into PostgreSQL.")
+    parser.add_argument("csv", nargs="?", default="hospital_dataset.csv",
+                        help="doctor CSV (hospital_dataset.csv, the1.py's extended output or synthetic.py's .csv.gz)")
+    parser.add_argument("--skip-symptoms", action="store_true", help="only reload hospital_doctor_data")
+    args = parser.parse_args()
+
+    load_dotenv()
+    conn = psycopg2.connect(**connect_kwargs())
+    try:
+        report("hospital_doctor_data", *load_doctors(conn, args.csv))
+        if not args.skip_symptoms:
+            report("symptom_specialty", *load_symptoms(conn))
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
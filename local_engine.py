@@ -0,0 +1,159 @@
+import csv
+import time
+import sqlite3
+import threading
+from functools import lru_cache
+
+from db import PAGE_SIZE, DATA_TABLES
+from fast_path import specialty_map
+
+
+# -------------------- Schema --------------------
+# Same tables (and lower() indexes) load_data.py / hospital_summary.py create in Postgres
+SCHEMA = [
+    "CREATE TABLE hospital_doctor_data (hospital_name TEXT, area TEXT, doctor_name TEXT,"
+    " specialty TEXT, experience_years INT, availability BOOLEAN, available_beds INT)",
+    "CREATE TABLE symptom_specialty (symptom_keyword TEXT, specialty TEXT)",
+]
+INDEXES = [
+    "CREATE INDEX hospital_doctor_data_specialty_idx ON hospital_doctor_data (lower(specialty), availability)",
+    "CREATE INDEX hospital_doctor_data_hospital_name_idx ON hospital_doctor_data (lower(hospital_name), availability)",
+    "CREATE INDEX hospital_doctor_data_doctor_name_idx ON hospital_doctor_data (lower(doctor_name))",
+    "CREATE INDEX symptom_specialty_symptom_keyword_idx ON symptom_specialty (lower(symptom_keyword))",
+    "CREATE INDEX hospital_summary_name_idx ON hospital_summary (lower(hospital_name))",
+    "CREATE INDEX hospital_summary_area_beds_idx ON hospital_summary (lower(area), available_beds DESC)",
+    "CREATE INDEX hospital_summary_beds_idx ON hospital_summary (available_beds DESC)",
+]
+SUMMARY_SQL = """
+CREATE TABLE hospital_summary AS
+WITH per_specialty AS (
+    SELECT hospital_name, area, specialty,
+           count(*) AS doctors,
+           sum(availability) AS available,
+           max(available_beds) AS beds
+    FROM hospital_doctor_data
+    GROUP BY hospital_name, area, specialty
+)
+SELECT hospital_name, area,
+       max(beds) AS available_beds,
+       sum(doctors) AS total_doctors,
+       sum(available) AS available_doctors,
+       json_group_object(specialty, available) AS available_by_specialty
+FROM per_specialty
+GROUP BY hospital_name, area
+"""
+
+sqlite3.register_converter("BOOLEAN", lambda value: value not in (b"0", b""))
+
+
+@lru_cache(maxsize=1024)
+def to_sqlite(sql):
+    """Postgres SQL as the pipeline generates it (ILIKE, TRUE, %s, casts) → SQLite"""
+    import sqlglot
+    return sqlglot.transpile(sql, read="postgres", write="sqlite")[0]
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# -------------------- In-process Engine --------------------
+class LocalDatabase:
+    """
+    The chatbot tables in an in-memory SQLite database built from the CSV,
+    with the same run_query / run_prepared / pages interface as
+    db.ConnectionPool. Selected with CHATBOT_BACKEND=local; no database
+    server or network round trip involved.
+    """
+
+    def __init__(self, filepath="hospital_dataset.csv"):
+        self.filepath = filepath
+        self._lock = threading.Lock()
+        self._stats = {"queries": 0, "query_seconds_total": 0.0, "rows": 0, "load_seconds": 0.0}
+        started = time.perf_counter()
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES)
+        self.conn.row_factory = sqlite3.Row
+        self._load()
+        self._stats["load_seconds"] = time.perf_counter() - started
+
+    def _load(self):
+        for statement in SCHEMA:
+            self.conn.execute(statement)
+        with open(self.filepath, "r", encoding="utf-8", newline="") as f:
+            self.conn.executemany(
+                "INSERT INTO hospital_doctor_data VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((r["hospital_name"], r["area"], r["doctor_name"], r["specialty"], _to_int(r["experience_years"]),
+                  str(r["availability"]).strip().lower() == "true", _to_int(r["available_beds"]))
+                 for r in csv.DictReader(f)),
+            )
+        self.conn.executemany("INSERT INTO symptom_specialty VALUES (?, ?)", specialty_map.items())
+        self.conn.execute(SUMMARY_SQL)
+        for statement in INDEXES:
+            self.conn.execute(statement)
+        self.conn.execute("ANALYZE")
+        self.conn.commit()
+        with self._lock:
+            self._stats["rows"] = self.conn.execute("SELECT count(*) FROM hospital_doctor_data").fetchone()[0]
+
+    def run_query(self, sql, params=None, retries=1):
+        """Execute Postgres-dialect SQL and return all rows as dicts"""
+        translated = to_sqlite(sql.strip().rstrip(";"))
+        started = time.perf_counter()
+        with self._lock:
+            rows = [dict(row) for row in self.conn.execute(translated, tuple(params or ()))]
+            self._stats["queries"] += 1
+            self._stats["query_seconds_total"] += time.perf_counter() - started
+        return rows
+
+    def run_prepared(self, sql, params=(), retries=1):
+        # sqlite3 already keeps compiled statements in its statement cache
+        return self.run_query(sql, params)
+
+    def pages(self, sql, params=None, page_size=PAGE_SIZE):
+        return LocalPages(self, sql, params, page_size)
+
+    def data_version(self, tables=DATA_TABLES):
+        # Loaded once from the CSV and never written afterwards
+        return (self.filepath, self._stats["load_seconds"])
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot["query_seconds_avg"] = snapshot["query_seconds_total"] / (snapshot["queries"] or 1)
+        return snapshot
+
+    def close(self):
+        self.conn.close()
+
+
+class LocalPages:
+    """db.ResultPages for the local engine: LIMIT / OFFSET over the in-memory tables"""
+
+    def __init__(self, db, sql, params=None, page_size=PAGE_SIZE):
+        self.db = db
+        self.sql = f"SELECT * FROM ({sql.strip().rstrip(';')}) AS pages LIMIT %s OFFSET %s"
+        self.params = list(params or ())
+        self.page_size = page_size
+        self.total = None
+
+    def page(self, number):
+        rows = self.db.run_query(self.sql, self.params + [self.page_size + 1, number * self.page_size])
+        more, rows = len(rows) > self.page_size, rows[:self.page_size]
+        if not more and (rows or number == 0):
+            self.total = number * self.page_size + len(rows)
+        return rows
+
+    def has_next(self, number):
+        return self.total is None or (number + 1) * self.page_size < self.total
+
+    @property
+    def page_count(self):
+        if self.total is None:
+            return None
+        return max(1, -(-self.total // self.page_size))
+
+    def close(self):
+        pass
@@ -5,6 +5,8 @@ import re
 from dotenv import load_dotenv
 from groq import Groq
 from thefuzz import process
+from llm_cache import get_cache
+import prompts
 import psycopg2.extras
 
 # -------------------- Load Environment Variables --------------------
@@ -12,6 +14,7 @@ load_dotenv(dotenv_path="c:/Users/Sachi/OneDrive/Documents/Python Scripts/.env")
 
 # Initialize Groq client
 client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+LLAMA_MODEL = "llama-3.1-8b-instant"
 
 # Connect to PostgreSQL
 conn = psycopg2.connect(
@@ -24,77 +27,7 @@ conn = psycopg2.connect(
 cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
 # -------------------- Prompt Template --------------------
-SYSTEM_PROMPT = '''
-You are a hospital-doctor information assistant.
-Your job is to convert user questions into SQL queries, execute them,
-and then return a polite natural-language answer.
-
-You must strictly follow these rules:
-
-1. Input: User will ask about hospitals, doctors, symptoms, specialties, beds, or availability.
-2. Output: You MUST return ONLY a valid SQL SELECT query (no explanations, no extra text).
-3. Always query using ONLY these tables:
-   - hospital_doctor_data(hospital_name, area, doctor_name, specialty, experience_years, availability, available_beds)
-   - symptom_specialty(symptom_keyword, specialty)
-4. Table and column names MUST NOT be altered, misspelled, or changed in any way. Use the names exactly as above.
-5. If the input is ambiguous or unclear, make the best guess to construct a logically valid SQL query.
-6. The query must ALWAYS limit the results to MAX 3 rows.
-7. If the user query implies available doctors or availability (keywords like "available", "free", "now", "open"),
-   always add "AND availability = TRUE" in the SQL WHERE clause.
-8. For text comparisons such as 'specialty' or 'symptom_keyword', use case-insensitive matching with ILIKE, e.g.:
-   SELECT ... FROM hospital_doctor_data WHERE specialty ILIKE '<specialty>' LIMIT 1;
-9. Do NOT include any column or table not specified above.
-10. You should ONLY focus on medical-related replies. Do NOT provide answers unrelated to medical, hospital, doctor, symptoms, or specialties.
-11. If a symptom from a user query is NOT found in the database, you MUST infer or fetch medically relevant information on your own to provide a helpful answer.
-12. If the doctor is asked from any hospital give the necessary doctor dont make limit 3.
-
---------------------
-DATABASE SCHEMA
---------------------
-Table: hospital_doctor_data
-   - hospital_name TEXT
-   - area TEXT
-   - doctor_name TEXT
-   - specialty TEXT
-   - experience_years INT
-   - availability TEXT
-   - available_beds INT
-
-Table: symptom_specialty
-   - symptom_keyword TEXT
-   - specialty TEXT
-
---------------------
-TASK
---------------------
-1. Carefully understand the user query and map it to the correct SQL SELECT statement using ONLY the above tables and columns.
-2. Return ONLY the SQL SELECT query, without any additional text or explanation.
-3. Use proper PostgreSQL syntax, respecting case insensitivity and the required availability filter.
-4. Ensure your SQL queries are syntactically correct and executable.
-5. When symptoms are missing in the database, do NOT return empty results—use your medical knowledge to infer or provide relevant information.
-
------------------------
-EXAMPLES
------------------------
-
-Example (Doctor query):
-SELECT doctor_name, specialty, experience_years, availability, hospital_name
-FROM hospital_doctor_data
-WHERE doctor_name = '<doctor_name>'
-LIMIT 1;
-
-Example (Hospital query):
-SELECT doctor_name, specialty, experience_years, availability, hospital_name
-FROM hospital_doctor_data
-WHERE hospital_name = '<hospital_name>'
-LIMIT 1;
-
-Example (Symptom query):
-SELECT doctor_name, specialty, experience_years, availability, hospital_name
-FROM hospital_doctor_data
-WHERE specialty IN (SELECT specialty FROM symptom_specialty WHERE symptom_keyword = '<symptom>')
-LIMIT 1;
-'''
+SYSTEM_PROMPT = prompts.SYSTEM_PROMPT  # single copy, shared with chatbot.py
 
 def normalize_input(user_query: str) -> str:
     """Clean up messy user input for better matching"""
@@ -104,16 +37,19 @@ def normalize_input(user_query: str) -> str:
     return text.strip()
 
 def ask_llama(user_query: str) -> str:
-    """Send user query to Groq (LLaMA) and return response"""
-    response = client.chat.completions.create(
-        model="llama-3.1-8b-instant",
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": user_query}
-        ],
-        temperature=0  # deterministic SQL
-    )
-    return response.choices[0].message.content.strip()
+    """Send user query to Groq (LLaMA) and return response (cached, since temperature=0 is deterministic)"""
+    def call():
+        response = client.chat.completions.create(
+            model=LLAMA_MODEL,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": user_query}
+            ],
+            temperature=0  # deterministic SQL
+        )
+        return response.choices[0].message.content.strip()
+
+    return get_cache().get_or_call(LLAMA_MODEL, SYSTEM_PROMPT, user_query, call)
 
 def fuzzy_match(user_input, column_values):
     """Fuzzy match user input to closest column value"""
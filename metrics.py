@@ -0,0 +1,220 @@
+import os
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def enabled_from_env():
+    return os.getenv("CHATBOT_METRICS", "0").lower() in ("1", "true", "yes")
+
+
+# Off unless CHATBOT_METRICS=1; stage timings are still attached to replies either way.
+# Read again by start_exporters_from_env, once the .env file has been loaded.
+ENABLED = enabled_from_env()
+
+SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 3, 10, 100, 1000, 10000, 100000)
+
+
+# -------------------- Registry --------------------
+class Registry:
+    """Prometheus-style counters, histograms and callback gauges"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._gauge_sources = {}
+        self._help = {}
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=SECONDS_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = {"buckets": buckets, "counts": [0] * len(buckets), "sum": 0.0, "count": 0}
+            index = bisect.bisect_left(hist["buckets"], value)
+            if index < len(hist["counts"]):
+                hist["counts"][index] += 1
+            hist["sum"] += value
+            hist["count"] += 1
+
+    def register_gauges(self, prefix, source):
+        """source() returns a dict of numbers, read each time metrics are rendered"""
+        self._gauge_sources[prefix] = source
+
+    def describe(self, name, text):
+        self._help[name] = text
+
+    def render(self):
+        """Metrics in the Prometheus text exposition format"""
+        lines = []
+        seen = set()
+
+        def header(name, kind):
+            if name not in seen:
+                seen.add(name)
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        def fmt(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((k, dict(v, counts=list(v["counts"]))) for k, v in self._histograms.items())
+
+        for (name, labels), value in counters:
+            header(name, "counter")
+            lines.append(f"{name}{fmt(labels)} {value}")
+
+        for (name, labels), hist in histograms:
+            header(name, "histogram")
+            cumulative = 0
+            for bound, count in zip(hist["buckets"], hist["counts"]):
+                cumulative += count
+                lines.append(f"{name}_bucket{fmt(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_bucket{fmt(labels, [('le', '+Inf')])} {hist['count']}")
+            lines.append(f"{name}_sum{fmt(labels)} {hist['sum']}")
+            lines.append(f"{name}_count{fmt(labels)} {hist['count']}")
+
+        for prefix, source in sorted(self._gauge_sources.items()):
+            try:
+                values = source()
+            except Exception:
+                continue
+            for key, value in sorted(values.items()):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    header(f"{prefix}_{key}", "gauge")
+                    lines.append(f"{prefix}_{key} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+registry.describe("chatbot_stage_seconds", "Time spent in each get_chatbot_reply stage")
+registry.describe("chatbot_requests_total", "Replies served, by path")
+registry.describe("chatbot_llm_tokens_total", "Groq tokens used, by kind and prompt profile")
+registry.describe("chatbot_llm_seconds", "Groq call latency, by prompt profile")
+registry.describe("chatbot_result_rows", "Rows returned per query")
+registry.describe("chatbot_update_lag_seconds", "Time from a doctor / bed change to it being applied")
+registry.describe("chatbot_update_errors_total", "Update batches that failed to apply")
+
+
+def inc(name, value=1, **labels):
+    if ENABLED:
+        registry.inc(name, value, **labels)
+
+
+def observe(name, value, buckets=SECONDS_BUCKETS, **labels):
+    if ENABLED:
+        registry.observe(name, value, buckets, **labels)
+
+
+# -------------------- Stage Timing --------------------
+class StageTimer:
+    """Collects per-stage timings (milliseconds) for one request"""
+
+    def __init__(self):
+        self.timings = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def span(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.timings[stage] = round(elapsed * 1000, 3)
+            if ENABLED:
+                registry.observe("chatbot_stage_seconds", elapsed, stage=stage)
+
+    def finish(self, path):
+        elapsed = time.perf_counter() - self._started
+        self.timings["total"] = round(elapsed * 1000, 3)
+        if ENABLED:
+            registry.observe("chatbot_stage_seconds", elapsed, stage="total")
+            registry.inc("chatbot_requests_total", path=path)
+        return self.timings
+
+
+# -------------------- Exporters --------------------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("", "/metrics"):
+            self.send_error(404)
+            return
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(port, host="127.0.0.1"):
+    """Serve /metrics from a daemon thread"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def write_textfile(path):
+    """Atomically write the current metrics (node_exporter textfile style)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(registry.render())
+    os.replace(tmp_path, path)
+
+
+def start_file_exporter(path, interval=15.0):
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                write_textfile(path)
+            except OSError:
+                pass
+
+    threading.Thread(target=loop, name="metrics-file", daemon=True).start()
+
+
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+
+def start_exporters_from_env():
+    """
+    Turn metrics on if CHATBOT_METRICS is set now (callers load .env
+    first) and start the exporters configured by CHATBOT_METRICS_PORT /
+    CHATBOT_METRICS_FILE, once
+    """
+    global ENABLED, _exporters_started
+    if not enabled_from_env():
+        return
+    ENABLED = True
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+    port = os.getenv("CHATBOT_METRICS_PORT")
+    if port:
+        start_http_server(int(port))
+    path = os.getenv("CHATBOT_METRICS_FILE")
+    if path:
+        start_file_exporter(path, float(os.getenv("CHATBOT_METRICS_INTERVAL", "15")))
@@ -0,0 +1,144 @@
+import re
+import sys
+import time
+import statistics
+
+import psycopg2.extras
+
+
+# -------------------- Query Shape Recognition --------------------
+# The SYSTEM_PROMPT examples: lookups by doctor, by hospital, by specialty or
+# via the symptom_specialty subquery, optionally with the availability filter.
+_LITERAL = r"'(?:[^']|'')*'"
+# sql_rewrite emits LOWER(column) for case-insensitive matches
+_TEXT_COLUMN = r"(?:LOWER\(\s*)?(?:doctor_name|hospital_name|specialty|area)(?:\s*\))?"
+_KEYWORD_COLUMN = r"(?:LOWER\(\s*)?symptom_keyword(?:\s*\))?"
+_CONDITION = re.compile(
+    rf"""^(?:
+        {_TEXT_COLUMN}\s*(?:=|I?LIKE)\s*{_LITERAL}
+      | availability\s*=\s*TRUE
+      | specialty\s+IN\s*\(\s*SELECT\s+specialty\s+FROM\s+symptom_specialty\s+
+            WHERE\s+{_KEYWORD_COLUMN}\s*(?:=|I?LIKE)\s*{_LITERAL}\s*\)
+    )$""",
+    re.I | re.X,
+)
+_SHAPE = re.compile(
+    r"^\s*SELECT\s+(?P<columns>[\w\s,*]+?)\s+FROM\s+hospital_doctor_data\s+"
+    r"WHERE\s+(?P<where>.+?)(?:\s+LIMIT\s+(?P<limit>\d+))?\s*;?\s*$",
+    re.I | re.S,
+)
+_AND = re.compile(r"\s+AND\s+", re.I)
+
+
+def _split_conditions(where):
+    """Split on top-level AND (the subquery's own WHERE has no AND)"""
+    parts, start = [], 0
+    for match in _AND.finditer(where):
+        if where.count("(", 0, match.start()) == where.count(")", 0, match.start()):
+            parts.append(where[start:match.start()])
+            start = match.end()
+    parts.append(where[start:])
+    return [p.strip() for p in parts]
+
+
+def parameterize(sql):
+    """
+    If sql has one of the recurring shapes, return (sql_with_placeholders,
+    params) with every string literal lifted into a bound parameter;
+    otherwise None and the SQL runs as raw text.
+    """
+    match = _SHAPE.match(sql)
+    if not match:
+        return None
+    conditions = _split_conditions(match.group("where"))
+    if not all(_CONDITION.match(c) for c in conditions):
+        return None
+
+    params = []
+
+    def lift(literal):
+        params.append(literal.group(0)[1:-1].replace("''", "'"))
+        return "%s"
+
+    skeleton = re.sub(_LITERAL, lift, sql.strip().rstrip(";").strip())
+    # One statement per shape regardless of spacing / keyword case
+    skeleton = re.sub(r"\s+", " ", skeleton)
+    return skeleton, params
+
+
+def run(pool, sql, params=None):
+    """Execute through a prepared statement when the shape is known, else as plain SQL"""
+    if params:
+        return pool.run_prepared(sql, params)
+    lifted = parameterize(sql)
+    if lifted:
+        return pool.run_prepared(*lifted)
+    return pool.run_query(sql)
+
+
+# -------------------- Plan-time Report --------------------
+def _explain_times(cur, statement, params=None):
+    cur.execute(f"EXPLAIN (ANALYZE, SUMMARY) {statement}", params)
+    text = "\n".join(row["QUERY PLAN"] for row in cur.fetchall())
+    planning = re.search(r"Planning Time: ([\d.]+) ms", text)
+    execution = re.search(r"Execution Time: ([\d.]+) ms", text)
+    return float(planning.group(1)) if planning else 0.0, float(execution.group(1)) if execution else 0.0
+
+
+def compare_plan_times(conn, sql, params, runs=20):
+    """
+    Planning/execution time (ms, from EXPLAIN ANALYZE) and client round trip
+    for the same query sent as raw text vs. EXECUTE of a prepared statement.
+    """
+    from db import dollar_placeholders
+    from fast_path import render_sql
+
+    raw_sql = render_sql(sql, params)
+    name = "plan_report_stmt"
+    report = {}
+    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+        cur.execute(f"PREPARE {name} AS {dollar_placeholders(sql.strip().rstrip(';'))}")
+        execute_sql = f"EXECUTE {name}({', '.join(['%s'] * len(params))})"
+        try:
+            for label, statement, args in (("raw", raw_sql, None), ("prepared", execute_sql, params)):
+                plans, execs, trips = [], [], []
+                for _ in range(runs):
+                    planning, execution = _explain_times(cur, statement, args)
+                    plans.append(planning)
+                    execs.append(execution)
+                    started = time.perf_counter()
+                    cur.execute(statement, args)
+                    cur.fetchall()
+                    trips.append((time.perf_counter() - started) * 1000)
+                report[label] = {
+                    "planning_ms": statistics.median(plans),
+                    "execution_ms": statistics.median(execs),
+                    "round_trip_ms": statistics.median(trips),
+                }
+        finally:
+            cur.execute(f"DEALLOCATE {name}")
+    return report
+
+
+if __name__ == "__main__":
+    # python prepared.py "cardiologist available at psg" "i have chest pain" ...
+    from dotenv import load_dotenv
+    from db import connect_kwargs
+    from fast_path import detect_intent, build_sql
+
+    load_dotenv()
+    conn = psycopg2.connect(**connect_kwargs())
+    conn.set_session(readonly=True, autocommit=True)
+    questions = sys.argv[1:] or ["cardiologist available at psg hospitals", "i have chest pain", "beds at ganga hospital"]
+    for question in questions:
+        intent = detect_intent(question.lower(), "hospital_dataset.csv")
+        if not intent:
+            print(f"⚠️ '{question}' does not match a template shape, skipped")
+            continue
+        sql, params = build_sql(intent)
+        report = compare_plan_times(conn, sql, params)
+        print(f"\n🩺 {question}")
+        for label, times in report.items():
+            print(f"   {label:<9} planning {times['planning_ms']:.3f} ms | execution {times['execution_ms']:.3f} ms"
+                  f" | round trip {times['round_trip_ms']:.3f} ms")
+    conn.close()
@@ -0,0 +1,192 @@
+import os
+import time
+import argparse
+
+
+# -------------------- Prompt Registry --------------------
+# The one copy of the text-to-SQL prompt. chatbot.py, h1.py, sam.py and
+# medical_chatbot.py all import it from here.
+SYSTEM_PROMPT = '''
+You are a hospital-doctor information assistant.  
+Your job is to convert user questions into SQL queries, execute them,  
+and then return a polite natural-language answer.
+
+You must strictly follow these rules:
+
+1. Input: User will ask about hospitals, doctors, symptoms, specialties, beds, or availability.  
+2. Output: You MUST return ONLY a valid SQL SELECT query (no explanations, no extra text).  
+3. Always query using ONLY these tables:  
+   - hospital_doctor_data(hospital_name, area, doctor_name, specialty, experience_years, availability, available_beds)  
+   - symptom_specialty(symptom_keyword, specialty)  
+4. Table and column names MUST NOT be altered, misspelled, or changed in any way. Use the names exactly as above.  
+5. If the input is ambiguous or unclear, make the best guess to construct a logically valid SQL query.  
+6. The query must ALWAYS limit the results to MAX 3 rows.  
+7. If the user query implies available doctors or availability (keywords like "available", "free", "now", "open"),  
+   always add "AND availability = TRUE" in the SQL WHERE clause.  
+8. For text comparisons such as 'specialty' or 'symptom_keyword', use case-insensitive matching with ILIKE, e.g.:  
+   SELECT ... FROM hospital_doctor_data WHERE specialty ILIKE '<specialty>' LIMIT 3;  
+9. Do NOT include any column or table not specified above.  
+10. You should ONLY focus on medical-related replies. Do NOT provide answers unrelated to medical, hospital, doctor, symptoms, or specialties.  
+11. If a symptom from a user query is NOT found in the database, you MUST infer or fetch medically relevant information on your own to provide a helpful answer.
+12. If user asks for many/all doctors/hospitals, do NOT use LIMIT. Only limit when the query is specific.
+13. Always return a SQL SELECT query.
+14. Always use medically relevant fallback if results are absent.  
+
+--------------------  
+DATABASE SCHEMA  
+--------------------  
+Table: hospital_doctor_data  
+   - hospital_name TEXT  
+   - area TEXT  
+   - doctor_name TEXT  
+   - specialty TEXT  
+   - experience_years INT  
+   - availability BOOLEAN  
+   - available_beds INT  
+
+Table: symptom_specialty  
+   - symptom_keyword TEXT  
+   - specialty TEXT  
+
+--------------------  
+TASK  
+--------------------  
+1. Carefully understand the user query and map it to the correct SQL SELECT statement using ONLY the above tables and columns.  
+2. Return ONLY the SQL SELECT query, without any additional text or explanation.  
+3. Use proper PostgreSQL syntax, respecting case insensitivity and the required availability filter.  
+4. Ensure your SQL queries are syntactically correct and executable.  
+5. When symptoms are missing in the database, do NOT return empty results—use your medical knowledge to infer or provide relevant information.  
+
+-----------------------  
+EXAMPLES  
+-----------------------  
+
+Example (Doctor query):  
+SELECT doctor_name, specialty, experience_years, availability, hospital_name  
+FROM hospital_doctor_data  
+WHERE doctor_name = '<doctor_name>'  
+LIMIT 3;  
+
+Example (Hospital query):  
+SELECT doctor_name, specialty, experience_years, availability, hospital_name  
+FROM hospital_doctor_data  
+WHERE hospital_name = '<hospital_name>'  
+LIMIT 3;  
+
+Example (Symptom query):  
+SELECT doctor_name, specialty, experience_years, availability, hospital_name  
+FROM hospital_doctor_data  
+WHERE specialty IN (SELECT specialty FROM symptom_specialty WHERE symptom_keyword = '<symptom>')  
+LIMIT 3;  
+
+Example (Available doctors query):  
+SELECT doctor_name, specialty, experience_years, availability, hospital_name  
+FROM hospital_doctor_data  
+WHERE specialty ILIKE '<specialty>' AND availability = TRUE  
+LIMIT 3;  
+'''
+
+# Compact profiles: the schema and the essential rules only. sql_rewrite.py
+# still normalizes text matching and caps the row count afterwards.
+SCHEMA_PROMPT = """Translate the question about hospitals, doctors, symptoms, specialties, beds or availability into ONE PostgreSQL SELECT query. Reply with the SQL only.
+Tables (use exactly these names and columns):
+hospital_doctor_data(hospital_name, area, doctor_name, specialty, experience_years, availability BOOLEAN, available_beds)
+symptom_specialty(symptom_keyword, specialty)
+Match text with ILIKE. Add availability = TRUE when the user wants available/free/open/now doctors. LIMIT 3 unless the user asks for all/many."""
+
+EXAMPLES = {
+    "doctor": "SELECT doctor_name, specialty, experience_years, availability, hospital_name FROM hospital_doctor_data "
+              "WHERE doctor_name ILIKE '<doctor_name>' LIMIT 3;",
+    "hospital": "SELECT doctor_name, specialty, experience_years, availability, hospital_name FROM hospital_doctor_data "
+                "WHERE hospital_name ILIKE '<hospital_name>' LIMIT 3;",
+    "symptom": "SELECT doctor_name, specialty, experience_years, availability, hospital_name FROM hospital_doctor_data "
+               "WHERE specialty IN (SELECT specialty FROM symptom_specialty WHERE symptom_keyword ILIKE '<symptom>') LIMIT 3;",
+}
+
+
+def _intent_prompt(intent):
+    """Schema plus only the example for the detected intent (all three if it is unknown)"""
+    examples = [EXAMPLES[intent]] if intent in EXAMPLES else list(EXAMPLES.values())
+    return SCHEMA_PROMPT + "\nExample:\n" + "\n".join(examples)
+
+
+PROFILES = {
+    "full": lambda intent: SYSTEM_PROMPT,
+    "schema": lambda intent: SCHEMA_PROMPT,
+    "intent": _intent_prompt,
+}
+
+
+def prompt_profile():
+    """Profile used for LLM calls (CHATBOT_PROMPT_PROFILE: full, schema or intent)"""
+    profile = os.getenv("CHATBOT_PROMPT_PROFILE", "full")
+    if profile not in PROFILES:
+        raise ValueError(f"unknown CHATBOT_PROMPT_PROFILE {profile!r}, expected one of {sorted(PROFILES)}")
+    return profile
+
+
+def system_prompt(profile=None, intent=None):
+    """System prompt text for a profile; intent is the classifier's doctor / hospital / symptom guess"""
+    return PROFILES[profile or prompt_profile()](intent)
+
+
+# -------------------- Profile Report --------------------
+def compare(questions, profiles, intents=None, model="llama-3.1-8b-instant"):
+    """
+    Ask every question with every profile, bypassing llm_cache. Returns
+    {profile: {"calls", "seconds", "prompt_tokens", "completion_tokens", "valid_sql"}}
+    with totals over the questions.
+    """
+    from groq import Groq
+    from sql_rewrite import rewrite
+
+    client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+    report = {}
+    for profile in profiles:
+        totals = report[profile] = {"calls": 0, "seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0, "valid_sql": 0}
+        for i, question in enumerate(questions):
+            intent = intents[i] if intents else None
+            started = time.perf_counter()
+            response = client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt(profile, intent)},
+                    {"role": "user", "content": question}
+                ],
+                temperature=0
+            )
+            totals["seconds"] += time.perf_counter() - started
+            totals["calls"] += 1
+            totals["prompt_tokens"] += response.usage.prompt_tokens
+            totals["completion_tokens"] += response.usage.completion_tokens
+            totals["valid_sql"] += rewrite(response.choices[0].message.content.strip()) is not None
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare prompt profiles by size, and live by latency and tokens.")
+    parser.add_argument("questions", nargs="*", help="questions to send to Groq with every profile")
+    parser.add_argument("--profiles", default=",".join(PROFILES), help="comma-separated profiles")
+    parser.add_argument("--dataset", default="hospital_dataset.csv", help="CSV the intent classifier's vocabulary comes from")
+    args = parser.parse_args()
+    profiles = args.profiles.split(",")
+
+    # Rough size (4 characters per token) without calling the API
+    for profile in profiles:
+        for intent in (["doctor", "hospital", "symptom"] if profile == "intent" else [None]):
+            text = system_prompt(profile, intent)
+            label = f"{profile}/{intent}" if intent else profile
+            print(f"📏 {label:<16} {len(text):>5} chars ≈ {len(text) // 4:>4} tokens")
+
+    if args.questions:
+        from dotenv import load_dotenv
+        from intent_classifier import classify
+
+        load_dotenv()
+        intents = [classify(q.lower(), args.dataset)["intent"] for q in args.questions]
+        report = compare(args.questions, profiles, intents)
+        print(f"\n{'profile':<8} {'avg ms':>8} {'prompt tok':>11} {'compl tok':>10} {'valid SQL':>10}")
+        for profile, totals in report.items():
+            calls = totals["calls"] or 1
+            print(f"{profile:<8} {totals['seconds'] / calls * 1000:>8.0f} {totals['prompt_tokens'] / calls:>11.0f} "
+                  f"{totals['completion_tokens'] / calls:>10.0f} {totals['valid_sql']:>6}/{totals['calls']}")
@@ -0,0 +1,134 @@
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+
+
+# -------------------- SQL Canonicalization --------------------
+_LITERAL_OR_SPACE = re.compile(r"('(?:[^']|'')*')|(\s+)")
+
+
+def canonical_sql(sql):
+    """
+    Cache key text for sql: whitespace collapsed and keywords / identifiers
+    lowercased, string literals kept as they are, trailing semicolon dropped.
+    """
+    parts, last = [], 0
+    for match in _LITERAL_OR_SPACE.finditer(sql):
+        parts.append(sql[last:match.start()].lower())
+        parts.append(match.group(1) or " ")
+        last = match.end()
+    parts.append(sql[last:].lower())
+    return "".join(parts).strip().rstrip(";").strip()
+
+
+# -------------------- Result Cache --------------------
+class ResultCache:
+    """
+    LRU of query results keyed on canonical SQL + parameters. Every entry
+    belongs to one data version (db.table_version of the chatbot tables);
+    when the version changes the whole cache is dropped. The version is
+    re-read at most every check_seconds, so a write shows up within that
+    window. Entries also expire ttl_seconds after they were stored (0 keeps
+    them), which bounds staleness from writes that bypass the version
+    triggers.
+    """
+
+    def __init__(self, max_entries=1024, check_seconds=1.0, ttl_seconds=300.0):
+        self.max_entries = max_entries
+        self.check_seconds = check_seconds
+        self.ttl_seconds = ttl_seconds
+        self.version = None
+        self._checked_at = 0.0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0, "version_checks": 0}
+
+    def stale(self):
+        """True when the data version should be read again"""
+        return self.version is None or time.monotonic() - self._checked_at >= self.check_seconds
+
+    def set_version(self, version):
+        with self._lock:
+            self._checked_at = time.monotonic()
+            self._stats["version_checks"] += 1
+            if version != self.version:
+                if self._entries:
+                    self._stats["invalidations"] += 1
+                self._entries.clear()
+                self.version = version
+
+    def get(self, sql, params=None):
+        """Cached rows or None"""
+        key = (canonical_sql(sql), tuple(params or ()))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds > 0 and time.monotonic() - entry[1] >= self.ttl_seconds:
+                del self._entries[key]
+                self._stats["expirations"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            rows = entry[0]
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return rows
+
+    def put(self, sql, params, rows, version):
+        """Store rows read under version; dropped if the data changed meanwhile"""
+        key = (canonical_sql(sql), tuple(params or ()))
+        with self._lock:
+            if version != self.version:
+                return
+            self._entries[key] = (rows, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def get_or_run(self, sql, params, run, fetch_version):
+        """Cached rows, or run() and cache them; fetch_version() reads the current data version"""
+        if self.max_entries <= 0:
+            return run()
+        if self.stale():
+            self.set_version(fetch_version())
+        version = self.version
+        rows = self.get(sql, params)
+        if rows is None:
+            rows = run()
+            self.put(sql, params, rows, version)
+        return rows
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats, entries=len(self._entries))
+        lookups = snapshot["hits"] + snapshot["misses"]
+        snapshot["hit_ratio"] = snapshot["hits"] / lookups if lookups else 0.0
+        return snapshot
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_result_cache():
+    """
+    Process-wide cache configured by RESULT_CACHE_SIZE (0 disables) /
+    RESULT_CACHE_VERSION_SECONDS / RESULT_CACHE_TTL_SECONDS
+    """
+    global _default_cache
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                _default_cache = ResultCache(
+                    max_entries=int(os.getenv("RESULT_CACHE_SIZE", "1024")),
+                    check_seconds=float(os.getenv("RESULT_CACHE_VERSION_SECONDS", "1")),
+                    ttl_seconds=float(os.getenv("RESULT_CACHE_TTL_SECONDS", "300")),
+                )
+    return _default_cache
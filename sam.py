@@ -228,11 +228,13 @@ if __name__ == "__main__":
         print(response)'''
 
 import os
-import csv
 import re
 from dotenv import load_dotenv
 from groq import Groq
 from thefuzz import process
+from doctor_store import load_store
+from updates import follow_from_env
+from areas import extract_area
 
 # Load environment and initialize Groq client
 load_dotenv()
@@ -335,33 +337,12 @@ def extract_symptom_and_hospital(user_text):
                 break
     return symptom, true_hospital
 
-def find_doctors(filepath, specialty, hospital, max_alts=2):
-    doctors_primary = []
-    doctors_alt = []
-    seen_hospitals = set()
-    with open(filepath, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row['availability'].strip().lower() != "true":
-                continue
-            # Normalize for matching 
-            row_hospital_norm = normalize(row['hospital_name'])
-            hospital_norm = normalize(hospital) if hospital else None
-            row_specialty_norm = row['specialty'].lower()
-            specialty_norm = specialty.lower()
-
-            # Primary hospital and specialty match
-            if hospital_norm and row_hospital_norm == hospital_norm and row_specialty_norm == specialty_norm:
-                doctors_primary.append(row)
-            # Alternatives: same specialty, different hospital
-            elif row_specialty_norm == specialty_norm:
-                key = (row['hospital_name'], row['area'])
-                if key not in seen_hospitals and (not hospital_norm or row_hospital_norm != hospital_norm):
-                    doctors_alt.append(row)
-                    seen_hospitals.add(key)
-                    if len(doctors_alt) == max_alts:
-                        break
-    return doctors_primary, doctors_alt
+def find_doctors(filepath, specialty, hospital, max_alts=2, location=None):
+    # Index probes on a store loaded once per file instead of re-parsing the CSV every question;
+    # availability / bed changes from the update feed (updates.py) are applied to it in place.
+    # Alternatives are the nearest hospitals to location (or the requested hospital's area)
+    follow_from_env(filepath)
+    return load_store(filepath).find_doctors(specialty, hospital, max_alts, location)
 
 def format_doc(row):
     return (f"Doctor: {row['doctor_name']} | Specialty: {row['specialty']} | "
@@ -374,7 +355,8 @@ def get_chatbot_reply(user_text, filepath="database_hosp.csv"):
     specialty = specialty_map.get(symptom, None)
     if not specialty:
         return "Sorry, I couldn't match your symptom to a medical specialty. Please rephrase."
-    doctors_primary, doctors_alt = find_doctors(filepath, specialty, hospital)
+    location = extract_area(user_text)
+    doctors_primary, doctors_alt = find_doctors(filepath, specialty, hospital, location=location)
     hospital_display = hospital if hospital else "Not specified"
     strict_prompt = f"""
 You are a helpful medical chatbot. ONLY use the data provided; do NOT invent or embellish details.
@@ -382,11 +364,12 @@ You are a helpful medical chatbot. ONLY use the data provided; do NOT invent or
 User request: "{user_text}"
 Symptom: {symptom}
 Hospital: {hospital_display}
+Area: {location or "Not specified"}
 
 Doctor(s) at requested hospital:
 {format_doc(doctors_primary[0]) if doctors_primary else "None available."}
 
-Alternative hospitals for the same specialty (up to 2):
+Alternative hospitals for the same specialty, nearest first (up to 2):
 {chr(10).join([format_doc(doc) for doc in doctors_alt]) if doctors_alt else "None available."}
 
 Instructions:
@@ -680,60 +663,6 @@ if __name__ == "__main__":
 
 
 
-SYSTEM_PROMPT = """
-You are a hospital-doctor information assistant.  
-Your job is to convert user questions into SQL queries, execute them, 
-and then return a polite natural-language answer.
-
-You must follow these rules strictly:
-
-1. Input: User will ask about hospitals, doctors, symptoms, specialties, beds, or availability.
-2. Output: You MUST return ONLY a valid SQL query (no explanations, no natural text).
-3. Always query using ONLY these tables:
-   - hospital_doctor_data(hospital_name, area, doctor_name, specialty, experience_years, availability, available_beds)
-   - symptom_specialty(symptom_keyword, specialty)
-4. DO NOT make any typo or change in table or column names. Use the table names exactly:
-   hospital_doctor_data, symptom_specialty
-5. If input is unclear, make the best SQL guess.
-6. Always limit results to MAX 3 rows.
-7. If the user query implies available doctors (words like "available", "free", "now"), always add "AND availability = TRUE" in your SQL WHERE clause.
-8. When filtering text columns such as 'specialty', perform case-insensitive comparisons using ILIKE in PostgreSQL, (e.g.):
-SELECT ... FROM hospital_doctor_data WHERE specialty ILIKE '<specialty>' LIMIT 3;
-
---------------------
-DATABASE SCHEMA
---------------------
-Table: hospital_doctor_data
-    - hospital_name TEXT
-    - area TEXT
-    - doctor_name TEXT
-    - specialty TEXT
-    - experience_years INT
-    - availability TEXT
-    - available_beds INT
-
-Table: symptom_specialty
-    - symptom_keyword TEXT
-    - specialty TEXT
-
---------------------
-TASK
---------------------
-1. Understand user query and map it to SQL using ONLY the above tables.  
-2. Output ONLY the SQL query.  
-3. Use SELECT statements fetching relevant columns.  
-4. Examples:
-
-Example (Doctor query):  
-SELECT doctor_name, specialty, experience_years, availability, hospital_name FROM hospital_doctor_data WHERE doctor_name = '<doctor_name>' LIMIT 3;
-
-Example (Hospital query):  
-SELECT doctor_name, specialty, experience_years, availability, hospital_name FROM hospital_doctor_data WHERE hospital_name = '<hospital_name>' LIMIT 3;
-
-Example (Symptom query):  
-SELECT doctor_name, specialty, experience_years, availability, hospital_name FROM hospital_doctor_data WHERE specialty IN (SELECT specialty FROM symptom_specialty WHERE symptom_keyword = '<symptom>') LIMIT 3;
-"""
-
 import os
 import psycopg2
 import json
@@ -741,13 +670,18 @@ import re
 from dotenv import load_dotenv
 from groq import Groq
 from thefuzz import process
+from llm_cache import get_cache
+import prompts
 import psycopg2.extras
+import time
+from db import table_version
 
 # -------------------- Load Environment Variables --------------------
 load_dotenv()
 
 # Initialize Groq client
 client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+LLAMA_MODEL = "llama-3.1-8b-instant"
 
 # Connect to PostgreSQL
 conn = psycopg2.connect(
@@ -760,76 +694,7 @@ conn = psycopg2.connect(
 cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
 
 # -------------------- Prompt Template --------------------
-SYSTEM_PROMPT = '''
-You are a hospital-doctor information assistant.  
-Your job is to convert user questions into SQL queries, execute them,  
-and then return a polite natural-language answer.
-
-You must strictly follow these rules:
-
-1. Input: User will ask about hospitals, doctors, symptoms, specialties, beds, or availability.  
-2. Output: You MUST return ONLY a valid SQL SELECT query (no explanations, no extra text).  
-3. Always query using ONLY these tables:  
-   - hospital_doctor_data(hospital_name, area, doctor_name, specialty, experience_years, availability, available_beds)  
-   - symptom_specialty(symptom_keyword, specialty)  
-4. Table and column names MUST NOT be altered, misspelled, or changed in any way. Use the names exactly as above.  
-5. If the input is ambiguous or unclear, make the best guess to construct a logically valid SQL query.  
-6. The query must ALWAYS limit the results to MAX 3 rows.  
-7. If the user query implies available doctors or availability (keywords like "available", "free", "now", "open"),  
-   always add "AND availability = TRUE" in the SQL WHERE clause.  
-8. For text comparisons such as 'specialty' or 'symptom_keyword', use case-insensitive matching with ILIKE, e.g.:  
-   SELECT ... FROM hospital_doctor_data WHERE specialty ILIKE '<specialty>' LIMIT 3;  
-9. Do NOT include any column or table not specified above.  
-10. You should ONLY focus on medical-related replies. Do NOT provide answers unrelated to medical, hospital, doctor, symptoms, or specialties.  
-11. If a symptom from a user query is NOT found in the database, you MUST infer or fetch medically relevant information on your own to provide a helpful answer.  
-
---------------------  
-DATABASE SCHEMA  
---------------------  
-Table: hospital_doctor_data  
-   - hospital_name TEXT  
-   - area TEXT  
-   - doctor_name TEXT  
-   - specialty TEXT  
-   - experience_years INT  
-   - availability TEXT  
-   - available_beds INT  
-
-Table: symptom_specialty  
-   - symptom_keyword TEXT  
-   - specialty TEXT  
-
---------------------  
-TASK  
---------------------  
-1. Carefully understand the user query and map it to the correct SQL SELECT statement using ONLY the above tables and columns.  
-2. Return ONLY the SQL SELECT query, without any additional text or explanation.  
-3. Use proper PostgreSQL syntax, respecting case insensitivity and the required availability filter.  
-4. Ensure your SQL queries are syntactically correct and executable.  
-5. When symptoms are missing in the database, do NOT return empty results—use your medical knowledge to infer or provide relevant information.  
-
------------------------  
-EXAMPLES  
------------------------  
-
-Example (Doctor query):  
-SELECT doctor_name, specialty, experience_years, availability, hospital_name  
-FROM hospital_doctor_data  
-WHERE doctor_name = '<doctor_name>'  
-LIMIT 3;  
-
-Example (Hospital query):  
-SELECT doctor_name, specialty, experience_years, availability, hospital_name  
-FROM hospital_doctor_data  
-WHERE hospital_name = '<hospital_name>'  
-LIMIT 3;  
-
-Example (Symptom query):  
-SELECT doctor_name, specialty, experience_years, availability, hospital_name  
-FROM hospital_doctor_data  
-WHERE specialty IN (SELECT specialty FROM symptom_specialty WHERE symptom_keyword = '<symptom>')  
-LIMIT 3;  
-'''
+SYSTEM_PROMPT = prompts.SYSTEM_PROMPT  # single copy, shared with chatbot.py
 
 def normalize_input(user_query: str) -> str:
     """Clean up messy user input for better matching"""
@@ -838,9 +703,41 @@ def normalize_input(user_query: str) -> str:
     text = text.replace("’", "'").replace("''", "'")
     return text.strip()
 
-def fetch_distinct_column_values(column_name: str):
-    cur.execute(f"SELECT DISTINCT {column_name} FROM hospital_doctor_data")
-    values = [row[column_name] for row in cur.fetchall() if row[column_name]]
+# Distinct values and fuzzy corrections, valid for one version of hospital_doctor_data
+distinct_cache = {"version": None, "values": {}, "corrections": {}, "checked_at": 0.0}
+MAX_CACHED_CORRECTIONS = 10000
+# Requests inside this window reuse the last version check instead of asking Postgres again
+VERSION_CHECK_SECONDS = float(os.getenv("DISTINCT_VERSION_CHECK_SECONDS", "1"))
+
+
+def fetch_data_version():
+    now = time.monotonic()
+    if distinct_cache["version"] is not None and now - distinct_cache["checked_at"] < VERSION_CHECK_SECONDS:
+        return distinct_cache["version"]
+    # conn is not autocommit; end the open transaction so the version is
+    # read from a fresh snapshot rather than one held since the last query
+    conn.rollback()
+    version = table_version(cur, ["hospital_doctor_data"])
+    distinct_cache["checked_at"] = now
+    return version
+
+
+def _distinct_cache_for(version):
+    if version is None:
+        version = fetch_data_version()
+    if distinct_cache["version"] != version:
+        distinct_cache.update(version=version, values={}, corrections={})
+    return distinct_cache
+
+
+def fetch_distinct_column_values(column_name: str, version=None):
+    """Distinct non-empty values of a column, re-read only when the table changes"""
+    cache = _distinct_cache_for(version)
+    values = cache["values"].get(column_name)
+    if values is None:
+        cur.execute(f"SELECT DISTINCT {column_name} FROM hospital_doctor_data")
+        values = [row[column_name] for row in cur.fetchall() if row[column_name]]
+        cache["values"][column_name] = values
     return values
 
 def fuzzy_match(user_input, column_values):
@@ -848,25 +745,39 @@ def fuzzy_match(user_input, column_values):
     best_match = process.extractOne(user_input, column_values)
     return best_match[0] if best_match else user_input
 
-def fuzzy_match_input(user_input: str, column_name: str) -> str:
-    distinct_values = fetch_distinct_column_values(column_name)
+def fuzzy_match_input(user_input: str, column_name: str, version=None) -> str:
+    cache = _distinct_cache_for(version)
+    key = (column_name, user_input)
+    corrected_input = cache["corrections"].get(key)
+    if corrected_input is not None:
+        return corrected_input
+
+    distinct_values = fetch_distinct_column_values(column_name, cache["version"])
+    corrected_input = user_input
     for val in distinct_values:
-        if val and val.lower() in user_input:
+        if val and val.lower() in corrected_input:
             corrected = fuzzy_match(val, distinct_values)
-            user_input = user_input.replace(val.lower(), corrected.lower())
-    return user_input
+            corrected_input = corrected_input.replace(val.lower(), corrected.lower())
+
+    if len(cache["corrections"]) >= MAX_CACHED_CORRECTIONS:
+        cache["corrections"].clear()
+    cache["corrections"][key] = corrected_input
+    return corrected_input
 
 def ask_llama(user_query: str) -> str:
-    """Send user query to Groq (LLaMA) and return response"""
-    response = client.chat.completions.create(
-        model="llama-3.1-8b-instant",
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": user_query}
-        ],
-        temperature=0  # deterministic SQL
-    )
-    return response.choices[0].message.content.strip()
+    """Send user query to Groq (LLaMA) and return response (cached, since temperature=0 is deterministic)"""
+    def call():
+        response = client.chat.completions.create(
+            model=LLAMA_MODEL,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": user_query}
+            ],
+            temperature=0  # deterministic SQL
+        )
+        return response.choices[0].message.content.strip()
+
+    return get_cache().get_or_call(LLAMA_MODEL, SYSTEM_PROMPT, user_query, call)
 
 def format_results(results, query_type="doctor"):
     """
@@ -931,9 +842,11 @@ def format_results(results, query_type="doctor"):
 def get_chatbot_reply(user_query, filepath):
     clean_query = normalize_input(user_query)
 
-    # Use fuzzy matching to correct typos on hospital names and specialties before querying Groq
-    clean_query = fuzzy_match_input(clean_query, "hospital_name")
-    clean_query = fuzzy_match_input(clean_query, "specialty")
+    # Use fuzzy matching to correct typos on hospital names and specialties before querying Groq.
+    # One cheap version check per request; the distinct values themselves come from the cache.
+    data_version = fetch_data_version()
+    clean_query = fuzzy_match_input(clean_query, "hospital_name", data_version)
+    clean_query = fuzzy_match_input(clean_query, "specialty", data_version)
 
     availability_filter = any(word in clean_query for word in ["available", "availability", "currently available", "free", "open", "now"])
 
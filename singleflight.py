@@ -0,0 +1,121 @@
+import asyncio
+import threading
+
+
+# -------------------- Thread Single-flight --------------------
+class Flight:
+    """One in-flight computation; followers wait() for the leader's result"""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self, timeout=None):
+        if not self._done.wait(timeout):
+            raise TimeoutError("in-flight call did not finish in time")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """
+    Concurrent calls with the same key share one execution: the first
+    caller (the leader) runs it, callers arriving while it is in flight
+    wait and get the same result or exception. Nothing is kept once the
+    call finishes, so this only collapses overlapping calls; caching is
+    llm_cache's job.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "executions": 0, "coalesced": 0, "errors": 0}
+
+    def begin(self, key):
+        """
+        (flight, leader). The leader must end the flight with finish() or
+        fail(); everyone else calls flight.wait().
+        """
+        with self._lock:
+            self._stats["calls"] += 1
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._stats["coalesced"] += 1
+                return flight, False
+            flight = self._flights[key] = Flight()
+            self._stats["executions"] += 1
+            return flight, True
+
+    def finish(self, key, flight, result):
+        with self._lock:
+            self._flights.pop(key, None)
+        flight.result = result
+        flight._done.set()
+
+    def fail(self, key, flight, error):
+        if not isinstance(error, Exception):
+            # e.g. GeneratorExit when a streaming leader is abandoned; not for followers to re-raise
+            error = RuntimeError(f"in-flight call abandoned ({type(error).__name__})")
+        with self._lock:
+            self._flights.pop(key, None)
+            self._stats["errors"] += 1
+        flight.error = error
+        flight._done.set()
+
+    def do(self, key, fn, *args, **kwargs):
+        """fn(*args, **kwargs), or the result of the identical call already running"""
+        flight, leader = self.begin(key)
+        if not leader:
+            return flight.wait()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self.fail(key, flight, e)
+            raise
+        self.finish(key, flight, result)
+        return result
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["in_flight"] = len(self._flights)
+        snapshot["coalesced_ratio"] = snapshot["coalesced"] / snapshot["calls"] if snapshot["calls"] else 0.0
+        return snapshot
+
+
+# -------------------- asyncio Single-flight --------------------
+class AsyncSingleFlight:
+    """
+    SingleFlight for coroutines on one event loop. The shared work runs as
+    its own task and every caller awaits it through asyncio.shield, so a
+    cancelled caller (even the first one) does not cancel it for the rest.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+        self._stats = {"calls": 0, "executions": 0, "coalesced": 0, "errors": 0}
+
+    def _finished(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled() and task.exception() is not None:
+            self._stats["errors"] += 1
+
+    async def do(self, key, fn, *args, **kwargs):
+        """await fn(*args, **kwargs), or the identical call already running"""
+        self._stats["calls"] += 1
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(fn(*args, **kwargs))
+            task.add_done_callback(lambda done: self._finished(key, done))
+            self._stats["executions"] += 1
+        else:
+            self._stats["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    def stats(self):
+        snapshot = dict(self._stats, in_flight=len(self._tasks))
+        snapshot["coalesced_ratio"] = snapshot["coalesced"] / snapshot["calls"] if snapshot["calls"] else 0.0
+        return snapshot
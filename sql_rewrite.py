@@ -0,0 +1,137 @@
+import re
+from functools import lru_cache
+
+import sqlglot
+from sqlglot import exp
+from sqlglot.errors import SqlglotError
+
+from db import MAX_ROWS
+
+
+# -------------------- Schema Knowledge --------------------
+DOCTOR_TABLE = "hospital_doctor_data"
+# Text columns matched case-insensitively; load_data.py indexes lower(<column>)
+TEXT_COLUMNS = {"hospital_name", "area", "doctor_name", "specialty", "symptom_keyword"}
+
+# Anything that writes, defines or runs an unparsed command
+_FORBIDDEN = (exp.DML, exp.DDL, exp.Drop, exp.Alter, exp.Create, exp.Command, exp.TruncateTable)
+_FENCE = re.compile(r"^```(?:sql)?\s*|\s*```$", re.I)
+
+
+# -------------------- Checks --------------------
+def _parse_select(sql):
+    """The single SELECT statement in sql, or None if there is anything else"""
+    try:
+        statements = [s for s in sqlglot.parse(sql, read="postgres") if s is not None]
+    except SqlglotError:
+        return None
+    if len(statements) != 1 or not isinstance(statements[0], exp.Select):
+        return None
+    tree = statements[0]
+    if any(tree.find_all(*_FORBIDDEN)):
+        return None
+    for select in tree.find_all(exp.Select):
+        if select.args.get("into") or select.args.get("locks"):
+            return None
+    return tree
+
+
+# -------------------- Transforms --------------------
+def _cap_limit(tree, max_limit, paginate=False):
+    """
+    Keep a literal LIMIT up to max_limit, otherwise LIMIT max_limit. With
+    paginate a query without LIMIT stays unlimited; the caller reads it
+    page by page (db.ResultPages).
+    """
+    limit = tree.args.get("limit")
+    if limit is None and paginate:
+        return
+    value = limit.expression if limit else None
+    if isinstance(value, exp.Literal) and not value.is_string and int(value.this) <= max_limit:
+        return
+    tree.limit(max_limit, copy=False)
+
+
+def _lower_text_match(node):
+    """
+    text_col = 'x' / text_col ILIKE 'x' → LOWER(text_col) = 'x' (or LIKE when
+    the literal has wildcards), which a lower(text_col) index can serve.
+    """
+    if not isinstance(node, (exp.EQ, exp.ILike)):
+        return node
+    column, literal = node.this, node.expression
+    if isinstance(column, exp.Literal):
+        column, literal = literal, column
+    if not (isinstance(column, exp.Column) and column.name.lower() in TEXT_COLUMNS
+            and isinstance(literal, exp.Literal) and literal.is_string):
+        return node
+    lowered = exp.Lower(this=column.copy())
+    pattern = exp.Literal.string(literal.this.lower())
+    if isinstance(node, exp.ILike) and ("%" in literal.this or "_" in literal.this):
+        return exp.Like(this=lowered, expression=pattern)
+    return exp.EQ(this=lowered, expression=pattern)
+
+
+def _add_availability(tree):
+    """
+    AND availability = TRUE on every SELECT that reads hospital_doctor_data
+    directly, unless that SELECT's WHERE already filters on availability
+    (selecting the column does not count). Subqueries on symptom_specialty
+    are left alone.
+    """
+    selects, seen = [], set()
+    for table in tree.find_all(exp.Table):
+        select = table.find_ancestor(exp.Select)
+        if table.name.lower() == DOCTOR_TABLE and select is not None and id(select) not in seen:
+            seen.add(id(select))
+            selects.append((select, table))
+    for select, table in selects:
+        where = select.args.get("where")
+        has_filter = where is not None and any(
+            column.name.lower() == "availability" and column.find_ancestor(exp.Select) is select
+            for column in where.find_all(exp.Column)
+        )
+        if has_filter:
+            continue
+        qualifier = table.alias_or_name if select.args.get("joins") else None
+        select.where(exp.EQ(this=exp.column("availability", table=qualifier), expression=exp.true()), copy=False)
+
+
+# -------------------- Entry Point --------------------
+@lru_cache(maxsize=2048)
+def rewrite(sql, availability_filter=False, max_limit=MAX_ROWS, paginate=False):
+    """
+    Post-process LLM SQL. Returns the rewritten SELECT, or None when the
+    text is not exactly one read-only SELECT statement. Results are cached
+    by input, so a repeated LLM answer costs one dict lookup.
+    """
+    tree = _parse_select(_FENCE.sub("", sql.strip()))
+    if tree is None:
+        return None
+    tree = tree.transform(_lower_text_match, copy=False)
+    if availability_filter:
+        _add_availability(tree)
+    _cap_limit(tree, max_limit, paginate)
+    return tree.sql(dialect="postgres")
+
+
+if __name__ == "__main__":
+    # (input, availability_filter, expected output)
+    CHECKS = [
+        ("SELECT doctor_name, availability FROM hospital_doctor_data WHERE specialty='Cardiology' LIMIT 3", True,
+         "SELECT doctor_name, availability FROM hospital_doctor_data "
+         "WHERE LOWER(specialty) = 'cardiology' AND availability = TRUE LIMIT 3"),
+        ("SELECT doctor_name FROM hospital_doctor_data WHERE availability = FALSE LIMIT 3", True,
+         "SELECT doctor_name FROM hospital_doctor_data WHERE availability = FALSE LIMIT 3"),
+        ("SELECT doctor_name FROM hospital_doctor_data", False,
+         f"SELECT doctor_name FROM hospital_doctor_data LIMIT {MAX_ROWS}"),
+        ("DELETE FROM hospital_doctor_data", False, None),
+    ]
+    failed = 0
+    for sql, availability_filter, expected in CHECKS:
+        got = rewrite(sql, availability_filter)
+        if got != expected:
+            failed += 1
+            print(f"❌ {sql}\n   expected {expected}\n   got      {got}")
+    print(f"{len(CHECKS) - failed}/{len(CHECKS)} rewrite checks passed")
+    raise SystemExit(1 if failed else 0)
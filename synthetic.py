@@ -0,0 +1,206 @@
+import csv
+import bz2
+import gzip
+import json
+import lzma
+import time
+import random
+import argparse
+import itertools
+
+from doctor_store import FIELDNAMES
+from fast_path import specialty_map
+from the1 import new_locations, specialties, first_names, last_names, hospital_name_pool
+
+
+# -------------------- Distributions --------------------
+# Rows are generated in fixed-size blocks, each from its own seeded Random,
+# so the output depends only on the seed and the arguments (not on how it
+# is chunked on disk) and memory stays flat at any row count.
+BLOCK_ROWS = 65536
+
+SPECIALIST = {
+    "Cardiology": "cardiologist", "Oncology": "oncologist", "Neurology": "neurologist",
+    "Orthopedics": "orthopedic surgeon", "Pediatrics": "pediatrician", "Dermatology": "dermatologist",
+    "Gynecology": "gynecologist", "General Medicine": "general physician",
+    "Gastroenterology": "gastroenterologist", "Ophthalmology": "eye doctor", "General Surgery": "surgeon",
+}
+
+
+def zipf_cum_weights(count, skew):
+    """Cumulative weights 1/rank^skew, for random.choices (skew 0 = uniform)"""
+    return list(itertools.accumulate(1.0 / (rank ** skew) for rank in range(1, count + 1)))
+
+
+def make_hospitals(count, seed, available_ratio=0.3):
+    """
+    count hospitals as (name, area, beds, availability ratio). The first
+    ones reuse the1.py's names; further ones become area branches. Each
+    hospital's share of available doctors is drawn around available_ratio;
+    at 0 or 1 (where the beta distribution is undefined) it is exactly that.
+    """
+    if not 0.0 <= available_ratio <= 1.0:
+        raise ValueError(f"available_ratio must be between 0 and 1, got {available_ratio}")
+    rng = random.Random(f"{seed}:hospitals")
+    spread = 8.0
+    hospitals = []
+    for i in range(count):
+        base = hospital_name_pool[i % len(hospital_name_pool)]
+        area = rng.choice(new_locations)
+        name = base if i < len(hospital_name_pool) else f"{base} {area} Branch {i // len(hospital_name_pool)}"
+        if available_ratio in (0.0, 1.0):
+            ratio = available_ratio
+        else:
+            ratio = rng.betavariate(available_ratio * spread, (1 - available_ratio) * spread)
+        hospitals.append((name, area, rng.randint(20, 600), ratio))
+    return hospitals
+
+
+class Workload:
+    """Hospitals, specialties and their popularity weights for one seed"""
+
+    def __init__(self, seed=0, hospitals=None, rows=0, skew=1.1, available_ratio=0.3):
+        self.seed = seed
+        count = hospitals or max(len(hospital_name_pool), rows // 250)
+        self.hospitals = make_hospitals(count, seed, available_ratio)
+        self.specialties = list(specialties)
+        # Hot hospitals and popular specialties come first in their lists
+        self.hospital_weights = zipf_cum_weights(len(self.hospitals), skew)
+        self.specialty_weights = zipf_cum_weights(len(self.specialties), skew)
+
+    def block(self, index, size):
+        """Rows [index * BLOCK_ROWS, index * BLOCK_ROWS + size) as CSV tuples"""
+        rng = random.Random(f"{self.seed}:rows:{index}")
+        hospitals = rng.choices(self.hospitals, cum_weights=self.hospital_weights, k=size)
+        picked = rng.choices(self.specialties, cum_weights=self.specialty_weights, k=size)
+        rows = []
+        for (name, area, beds, ratio), specialty in zip(hospitals, picked):
+            rows.append((
+                name, area,
+                f"Dr. {rng.choice(first_names)} {rng.choice(last_names)}",
+                specialty,
+                int(rng.triangular(1, 35, 8)),
+                "True" if rng.random() < ratio else "False",
+                beds,
+            ))
+        return rows
+
+    def rows(self, count):
+        """Yield blocks of rows until count rows have been produced"""
+        for index in range(-(-count // BLOCK_ROWS)):
+            yield self.block(index, min(BLOCK_ROWS, count - index * BLOCK_ROWS))
+
+    def questions(self, count, mix=(("symptom", 0.35), ("doctor", 0.25), ("hospital", 0.3), ("out_of_scope", 0.1))):
+        """
+        count {"id", "query", "intent"} records, with the same skew as the
+        rows: hot hospitals and popular specialties are asked about most.
+        """
+        rng = random.Random(f"{self.seed}:questions")
+        intents, weights = zip(*mix)
+        symptoms = {}
+        for symptom, specialty in specialty_map.items():
+            symptoms.setdefault(specialty, []).append(symptom)
+
+        for i in range(count):
+            intent = rng.choices(intents, weights)[0]
+            name, area, _, _ = rng.choices(self.hospitals, cum_weights=self.hospital_weights)[0]
+            specialty = rng.choices(self.specialties, cum_weights=self.specialty_weights)[0]
+            if intent == "symptom" and specialty in symptoms:
+                symptom = rng.choice(symptoms[specialty])
+                query = rng.choice([
+                    f"I have {symptom}, which doctor should I see?",
+                    f"{symptom} since yesterday, any doctor available at {name}?",
+                    f"need a doctor for {symptom} near {area}",
+                ])
+            elif intent in ("symptom", "doctor"):
+                intent = "doctor"
+                specialist = SPECIALIST.get(specialty, f"{specialty} doctor")
+                query = rng.choice([
+                    f"Is there a {specialist} available at {name}?",
+                    f"List all {specialist}s",
+                    f"Is Dr. {rng.choice(first_names)} {rng.choice(last_names)} available now?",
+                ])
+            elif intent == "hospital":
+                query = rng.choice([
+                    f"How many beds are free at {name}?",
+                    f"hospitals in {area} with beds available",
+                    f"which hospital in {area} has the most beds",
+                ])
+            else:
+                query = rng.choice([
+                    "tell me a joke", f"what is the weather in {area} today",
+                    "who won the cricket match yesterday", "recommend a good movie",
+                ])
+            yield {"id": i + 1, "query": query, "intent": intent}
+
+
+# -------------------- Output --------------------
+def open_output(path):
+    """Text file for path, compressed according to its .gz / .bz2 / .xz extension"""
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8", newline="", compresslevel=6)
+    if path.endswith(".bz2"):
+        return bz2.open(path, "wt", encoding="utf-8", newline="")
+    if path.endswith(".xz"):
+        return lzma.open(path, "wt", encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def write_rows(workload, count, path, progress=None):
+    """Stream count doctor rows to path one block at a time; returns rows written"""
+    written = 0
+    with open_output(path) as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDNAMES)
+        for block in workload.rows(count):
+            writer.writerows(block)
+            written += len(block)
+            if progress:
+                progress(written)
+    return written
+
+
+def write_questions(workload, count, path):
+    with open_output(path) as f:
+        for record in workload.questions(count):
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return count
+
+
+def ratio_arg(text):
+    """argparse type for a share between 0 and 1"""
+    value = float(text)
+    if not 0.0 <= value <= 1.0:
+        raise argparse.ArgumentTypeError(f"{text} is not between 0 and 1")
+    return value
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a seeded synthetic doctor dataset and question workload.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--output", default="hospital_dataset_synthetic.csv.gz",
+                        help="CSV path; .gz / .bz2 / .xz compress it")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--hospitals", type=int, help="number of hospitals (default: rows / 250)")
+    parser.add_argument("--skew", type=float, default=1.1,
+                        help="Zipf exponent for hospital and specialty popularity (0 = uniform)")
+    parser.add_argument("--available-ratio", type=ratio_arg, default=0.3, help="mean share of available doctors (0-1)")
+    parser.add_argument("--questions", help="also write a JSONL question workload (batch.py input) to this path")
+    parser.add_argument("--question-count", type=int, default=10_000)
+    args = parser.parse_args()
+
+    workload = Workload(args.seed, args.hospitals, args.rows, args.skew, args.available_ratio)
+    started = time.perf_counter()
+
+    def progress(written):
+        if written % (BLOCK_ROWS * 16) < BLOCK_ROWS:
+            elapsed = time.perf_counter() - started
+            print(f"   {written:,} rows ({written / elapsed:,.0f} rows/s)", flush=True)
+
+    written = write_rows(workload, args.rows, args.output, progress)
+    elapsed = time.perf_counter() - started
+    print(f"✅ {args.output}: {written:,} rows, {len(workload.hospitals):,} hospitals in {elapsed:.1f}s "
+          f"({written / elapsed:,.0f} rows/s)")
+    if args.questions:
+        write_questions(workload, args.question_count, args.questions)
+        print(f"✅ {args.questions}: {args.question_count:,} questions")
@@ -1,5 +1,6 @@
 import csv
 import random
+import argparse
 
 # Existing CSV file
 input_file = "database_hosp.csv"
@@ -57,21 +58,12 @@ hospital_name_pool = [
     "Grace Heart Institute", "Florence Eye Hospital", "Lifecare Children’s Hospital"
 ]
 
-# Avoid duplicates with existing hospitals
-existing_hospitals = set()
-with open(input_file, "r", encoding="utf-8") as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        existing_hospitals.add(row["hospital_name"])
-
-hospital_name_pool = [h for h in hospital_name_pool if h not in existing_hospitals]
-
 # Function to generate a new doctor row
-def generate_doctor(hospital, area, specialty):
-    doctor_name = f"Dr. {random.choice(first_names)} {random.choice(last_names)}"
-    experience = random.randint(5, 25)
-    availability = random.choice(["True", "False"])
-    beds = random.randint(80, 400)
+def generate_doctor(hospital, area, specialty, rng=random):
+    doctor_name = f"Dr. {rng.choice(first_names)} {rng.choice(last_names)}"
+    experience = rng.randint(5, 25)
+    availability = rng.choice(["True", "False"])
+    beds = rng.randint(80, 400)
     return {
         "hospital_name": hospital,
         "area": area,
@@ -82,27 +74,46 @@ def generate_doctor(hospital, area, specialty):
         "available_beds": beds
     }
 
-# Generate dataset
-rows = []
-doctors_per_hospital = 5
 
-for hospital_name in hospital_name_pool:
-    area = random.choice(new_locations)
-    used_specialties = random.sample(specialties, doctors_per_hospital)
-    for spec in used_specialties:
-        rows.append(generate_doctor(hospital_name, area, spec))
+if __name__ == "__main__":
+    # Same seed → same extended file (synthetic.py generates datasets at load-test scale)
+    parser = argparse.ArgumentParser(description="Append 5 doctors per new hospital to the existing CSV.")
+    parser.add_argument("--input", default=input_file)
+    parser.add_argument("--output", default=output_file)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    # Avoid duplicates with existing hospitals
+    existing_hospitals = set()
+    with open(args.input, "r", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            existing_hospitals.add(row["hospital_name"])
+
+    new_hospitals = [h for h in hospital_name_pool if h not in existing_hospitals]
+
+    # Generate dataset
+    rows = []
+    doctors_per_hospital = 5
+
+    for hospital_name in new_hospitals:
+        area = rng.choice(new_locations)
+        used_specialties = rng.sample(specialties, doctors_per_hospital)
+        for spec in used_specialties:
+            rows.append(generate_doctor(hospital_name, area, spec, rng))
 
-# Save extended dataset
-with open(output_file, "w", newline="", encoding="utf-8") as f:
-    fieldnames = ["hospital_name","area","doctor_name","specialty","experience_years","availability","available_beds"]
-    writer = csv.DictWriter(f, fieldnames=fieldnames)
-    writer.writeheader()
-    # Append existing dataset
-    with open(input_file, "r", encoding="utf-8") as fin:
-        for line in fin.readlines()[1:]:
-            f.write(line)
-    # Append new dataset
-    for row in rows:
-        writer.writerow(row)
+    # Save extended dataset
+    with open(args.output, "w", newline="", encoding="utf-8") as f:
+        fieldnames = ["hospital_name","area","doctor_name","specialty","experience_years","availability","available_beds"]
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        # Append existing dataset, streamed line by line
+        with open(args.input, "r", encoding="utf-8", newline="") as fin:
+            next(fin, None)
+            f.writelines(fin)
+        # Append new dataset
+        for row in rows:
+            writer.writerow(row)
 
-print(f"Extended dataset saved as {output_file} with total {len(rows)} rows (existing + new).")
+    print(f"Extended dataset saved as {args.output} with total {len(rows)} rows (existing + new).")
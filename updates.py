@@ -0,0 +1,363 @@
+import os
+import sys
+import json
+import time
+import random
+import select
+import argparse
+import threading
+
+import metrics
+from doctor_store import load_store, reload_store
+
+
+# -------------------- Update Format --------------------
+# One JSON object per change, in an append-only JSON-lines file or as the
+# payload of a Postgres NOTIFY on UPDATE_CHANNEL:
+#   {"kind": "availability", "hospital_name": ..., "doctor_name": ...,
+#    "specialty": ... (optional), "available": true, "ts": ...}
+#   {"kind": "beds", "hospital_name": ..., "beds_available": 12, "ts": ...}
+# ts is when the change happened (epoch seconds); the time it is applied
+# minus ts is the update lag. Both kinds carry absolute values, so applying
+# an update twice (a change file replayed from the start) changes nothing.
+UPDATE_CHANNEL = os.getenv("DOCTOR_UPDATES_CHANNEL", "doctor_updates")
+
+
+def availability_update(hospital, doctor, available, specialty=None, ts=None):
+    update = {"kind": "availability", "hospital_name": hospital, "doctor_name": doctor,
+              "available": bool(available), "ts": ts or time.time()}
+    if specialty:
+        update["specialty"] = specialty
+    return update
+
+
+def beds_update(hospital, beds_available, ts=None):
+    return {"kind": "beds", "hospital_name": hospital, "beds_available": int(beds_available), "ts": ts or time.time()}
+
+
+def valid_update(update):
+    """True for a record in the format above, with the fields its kind needs"""
+    if not isinstance(update, dict) or not isinstance(update.get("hospital_name"), str):
+        return False
+    ts = update.get("ts")
+    if ts is not None and (isinstance(ts, bool) or not isinstance(ts, (int, float))):
+        return False
+    if update.get("kind") == "beds":
+        beds = update.get("beds_available")
+        return isinstance(beds, int) and not isinstance(beds, bool) and beds >= 0
+    if update.get("kind") == "availability":
+        return isinstance(update.get("doctor_name"), str) and isinstance(update.get("available"), bool)
+    return False
+
+
+def parse_update(payload):
+    """The update in a JSON line / NOTIFY payload, or None if it is not one"""
+    try:
+        update = json.loads(payload)
+    except ValueError:
+        return None
+    return update if valid_update(update) else None
+
+
+# -------------------- Feeds --------------------
+class FileFeed:
+    """Tails an append-only JSON-lines change file from a byte offset"""
+
+    def __init__(self, path, offset=0, interval=0.1):
+        self.path = path
+        self.offset = offset
+        self.interval = interval
+        self.malformed = 0
+        self.resync = False  # never set: the file keeps every update
+
+    def poll(self):
+        """Updates appended since the last poll (a half-written last line waits for the next one)"""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() < self.offset:
+                    # Truncated / replaced: start over
+                    self.offset = 0
+                f.seek(self.offset)
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+
+        complete, newline, _ = data.rpartition(b"\n")
+        if not newline:
+            time.sleep(self.interval)
+            return []
+        self.offset += len(complete) + 1
+
+        updates = []
+        for line in complete.split(b"\n"):
+            if not line.strip():
+                continue
+            update = parse_update(line)
+            if update is None:
+                self.malformed += 1
+            else:
+                updates.append(update)
+        return updates
+
+    def rewind(self):
+        """Read the file from the start again (updates are absolute, so replaying is safe)"""
+        self.offset = 0
+
+    def close(self):
+        pass
+
+
+def append_updates(path, updates):
+    """Writer side of FileFeed: one line per update, flushed before returning"""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("".join(json.dumps(update, ensure_ascii=False) + "\n" for update in updates))
+
+
+class PostgresFeed:
+    """
+    LISTENs on a channel; each NOTIFY payload is one update. connect()
+    opens a connection; when it drops, the next poll opens a new one and
+    LISTENs again. NOTIFYs sent meanwhile are lost, so the feed then sets
+    resync and the applier reloads the store.
+    """
+
+    def __init__(self, connect, channel=UPDATE_CHANNEL, interval=1.0):
+        import psycopg2
+
+        self.connect = connect
+        self.channel = channel
+        self.interval = interval
+        self.malformed = 0
+        self.reconnects = 0
+        self.resync = False
+        self._errors = (psycopg2.OperationalError, psycopg2.InterfaceError)
+        self.conn = None
+        self._listen()
+
+    def _listen(self):
+        conn = self.connect()
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {self.channel}")
+        except BaseException:
+            conn.close()
+            raise
+        self.conn = conn
+
+    def _drop(self):
+        try:
+            self.conn.close()
+        except self._errors:
+            pass
+        self.conn = None
+
+    def poll(self):
+        if self.conn is None:
+            # Raises while the server is unreachable; the applier waits and polls again
+            self._listen()
+            self.reconnects += 1
+            self.resync = True
+            return []
+        try:
+            if select.select([self.conn], [], [], self.interval) == ([], [], []):
+                return []
+            self.conn.poll()
+        except self._errors:
+            self._drop()
+            raise
+        updates = []
+        while self.conn.notifies:
+            notify = self.conn.notifies.pop(0)
+            update = parse_update(notify.payload)
+            if update is None:
+                self.malformed += 1
+            else:
+                updates.append(update)
+        return updates
+
+    def rewind(self):
+        """Past NOTIFYs cannot be read again"""
+
+    def close(self):
+        if self.conn is not None:
+            self._drop()
+
+
+def notify_updates(cur, updates, channel=UPDATE_CHANNEL):
+    """Writer side of PostgresFeed (NOTIFY payloads are limited to 8000 bytes, so one update each)"""
+    for update in updates:
+        cur.execute("SELECT pg_notify(%s, %s)", (channel, json.dumps(update, ensure_ascii=False)))
+
+
+# -------------------- Applier --------------------
+class UpdateApplier:
+    """
+    Applies a feed to the resident DoctorStore of a CSV on a background
+    thread and keeps update-lag statistics. The store is looked up per
+    batch, so after load_store rebuilds it for a rewritten CSV later
+    updates go to the new one, and a change file is replayed from the
+    start so the new store has every update, as after a restart. When the
+    feed may have lost updates (feed.resync) the store is rebuilt from the
+    CSV.
+    """
+
+    def __init__(self, filepath, feed):
+        self.filepath = filepath
+        self.feed = feed
+        self._store = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats = {"batches": 0, "applied": 0, "unmatched": 0, "errors": 0, "reloads": 0, "lag_seconds_last": 0.0,
+                       "lag_seconds_max": 0.0, "lag_seconds_total": 0.0, "apply_seconds_total": 0.0}
+
+    def apply(self, updates):
+        if not updates:
+            return
+        started = time.perf_counter()
+        unmatched = load_store(self.filepath).apply(updates)
+        applied_at = time.time()
+        elapsed = time.perf_counter() - started
+
+        lags = [max(0.0, applied_at - float(u["ts"])) for u in updates if u.get("ts")]
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["applied"] += len(updates)
+            self._stats["unmatched"] += unmatched
+            self._stats["apply_seconds_total"] += elapsed
+            if lags:
+                self._stats["lag_seconds_last"] = lags[-1]
+                self._stats["lag_seconds_max"] = max(self._stats["lag_seconds_max"], max(lags))
+                self._stats["lag_seconds_total"] += sum(lags)
+        for lag in lags:
+            metrics.observe("chatbot_update_lag_seconds", lag)
+
+    def run(self):
+        while not self._stop.is_set():
+            try:
+                store = load_store(self.filepath)
+                if self._store is not None and store is not self._store:
+                    self.feed.rewind()
+                self._store = store
+                updates = self.feed.poll()
+                if self.feed.resync:
+                    reload_store(self.filepath)
+                    self.feed.resync = False
+                    with self._lock:
+                        self._stats["reloads"] += 1
+                self.apply(updates)
+            except Exception as e:
+                # One bad batch (or a feed hiccup) must not stop later updates
+                with self._lock:
+                    self._stats["errors"] += 1
+                metrics.inc("chatbot_update_errors_total")
+                print(f"❌ update feed for {self.filepath}: {type(e).__name__}: {e}", file=sys.stderr)
+                self._stop.wait(getattr(self.feed, "interval", 1.0))
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name=f"updates:{self.filepath}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.feed.close()
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot["lag_seconds_avg"] = snapshot["lag_seconds_total"] / (snapshot["applied"] or 1)
+        snapshot["malformed"] = self.feed.malformed
+        return snapshot
+
+
+_appliers = {}
+_appliers_lock = threading.Lock()
+
+
+def follow_from_env(filepath):
+    """
+    Keep filepath's DoctorStore current from DOCTOR_UPDATES_FILE (a change
+    file) or, with DOCTOR_UPDATES_LISTEN=1, Postgres NOTIFYs on
+    DOCTOR_UPDATES_CHANNEL. Started once per file; None if neither is set.
+    """
+    if filepath in _appliers:
+        return _appliers[filepath]
+    with _appliers_lock:
+        if filepath not in _appliers:
+            feed = None
+            if os.getenv("DOCTOR_UPDATES_FILE"):
+                feed = FileFeed(os.getenv("DOCTOR_UPDATES_FILE"))
+            elif os.getenv("DOCTOR_UPDATES_LISTEN", "0").lower() in ("1", "true", "yes"):
+                import psycopg2
+                from db import connect_kwargs
+                feed = PostgresFeed(lambda: psycopg2.connect(**connect_kwargs()))
+            _appliers[filepath] = UpdateApplier(filepath, feed).start() if feed else None
+            if feed:
+                metrics.registry.register_gauges("chatbot_updates", _appliers[filepath].stats)
+    return _appliers[filepath]
+
+
+# -------------------- Simulation --------------------
+def simulate(filepath, count, seed=0, bed_share=0.2):
+    """count random updates for doctors / hospitals that exist in filepath"""
+    rng = random.Random(seed)
+    store = load_store(filepath)
+    hospitals = store.columns["hospital_name"]
+    doctors = store.columns["doctor_name"]
+    for _ in range(count):
+        row_id = rng.randrange(len(store))
+        if rng.random() < bed_share:
+            beds = int(store.row(row_id).get("available_beds") or 0)
+            yield beds_update(hospitals[row_id], max(0, beds + rng.choice([-3, -2, -1, 1, 2])))
+        else:
+            yield availability_update(hospitals[row_id], doctors[row_id], rng.random() < 0.5)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Follow (or simulate) the doctor availability / bed update feed.")
+    parser.add_argument("--dataset", default="hospital_dataset.csv")
+    parser.add_argument("--file", help="append-only change file (JSON lines)")
+    parser.add_argument("--channel", help="Postgres LISTEN / NOTIFY channel instead of a file")
+    parser.add_argument("--simulate", type=int, help="write this many random updates instead of following")
+    parser.add_argument("--rate", type=float, default=100.0, help="simulated updates per second")
+    parser.add_argument("--every", type=float, default=5.0, help="seconds between lag reports while following")
+    args = parser.parse_args()
+
+    if args.channel:
+        import psycopg2
+        from dotenv import load_dotenv
+        from db import connect_kwargs
+        load_dotenv()
+
+    if args.simulate:
+        if args.channel:
+            conn = psycopg2.connect(**connect_kwargs())
+            conn.autocommit = True
+            cur = conn.cursor()
+        for update in simulate(args.dataset, args.simulate):
+            if args.channel:
+                notify_updates(cur, [update], args.channel)
+            else:
+                append_updates(args.file, [update])
+            time.sleep(1.0 / args.rate)
+        print(f"✅ wrote {args.simulate} updates")
+    else:
+        if args.channel:
+            feed = PostgresFeed(lambda: psycopg2.connect(**connect_kwargs()), args.channel)
+        else:
+            feed = FileFeed(args.file)
+        applier = UpdateApplier(args.dataset, feed).start()
+        try:
+            while True:
+                time.sleep(args.every)
+                s = applier.stats()
+                print(f"📥 {s['applied']} applied ({s['unmatched']} unmatched, {s['malformed']} malformed, "
+                      f"{s['errors']} errors, {s['reloads']} reloads) | lag last {s['lag_seconds_last'] * 1000:.1f}ms "
+                      f"avg {s['lag_seconds_avg'] * 1000:.1f}ms max {s['lag_seconds_max'] * 1000:.1f}ms")
+        except KeyboardInterrupt:
+            applier.stop()